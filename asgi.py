@@ -0,0 +1,15 @@
+"""ASGI entry point, for serving the app with an ASGI server:
+
+    uvicorn asgi:application --workers 4
+
+The Flask views still run in a thread pool, but the async views of
+asyncapi all run on the server's event loop, so they share one pool of
+async database connections per worker.
+"""
+from asgiref.wsgi import WsgiToAsgi
+
+from app import create_app
+
+app = create_app()
+app.config['ASYNC_DB_POOLED'] = True
+application = WsgiToAsgi(app)
@@ -0,0 +1,266 @@
+"""Fingerprinted, precompressed static assets.
+
+`flask assets build` writes to ASSETS_BUILD_DIR:
+
+* the BUNDLES, each concatenated from its sources and minified;
+* a copy of every other file under static/;
+* gzip and, when the brotli package is installed, brotli variants of
+  the compressible files;
+* manifest.json, mapping each name to its built file.
+
+Every built file has a hash of its contents in its name, e.g.
+css/site.3f9a0c1e22b4.css. The build's url() references in CSS point at
+other built files. Because a changed file gets a new name, the files are
+served from ASSETS_URL_PATH with a year-long immutable Cache-Control, and
+with the precompressed variant the client accepts.
+
+Templates link to assets with `asset_url(filename)` for a single file and
+`bundle_urls(name)` for a bundle. Without a build, or in debug mode,
+these return the plain /static URLs of the sources.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+import click
+from flask import abort, current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# name of the bundle: its sources under static/, in load order
+BUNDLES = {
+    'css/site.css': ['css/bootstrap.min.css', 'css/layout.main.css',
+                     'css/main.css', 'css/main.responsive.css',
+                     'css/main.quickfix.css'],
+    # loaded in the head, before the page renders
+    'js/head.js': ['js/libs/modernizr-2.8.2.min.js', 'js/libs/moment.min.js'],
+    # loaded with `defer`, after jQuery
+    'js/site.js': ['js/libs/bootstrap-3.1.1.min.js', 'js/plugins.js',
+                   'js/script.js'],
+}
+
+# precompress only what isn't compressed already (not images, not woff)
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.ttf', '.otf', '.eot',
+                '.json', '.txt')
+
+MANIFEST = 'manifest.json'
+
+CSS_URL = re.compile(r'''url\(\s*(['"]?)(.*?)\1\s*\)''')
+# strings and comments, which minify_css must leave alone or drop whole
+CSS_VERBATIM = re.compile(
+    r'''("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|/\*.*?\*/)''', re.S)
+
+assets_group = AppGroup('assets', help='Build the static assets.')
+
+
+def init_app(app):
+    """Serve ASSETS_BUILD_DIR and use its manifest outside debug mode."""
+    manifest = {}
+    path = os.path.join(app.config['ASSETS_BUILD_DIR'], MANIFEST)
+    if not app.debug and os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+    app.extensions['assets'] = manifest
+    app.add_url_rule(app.config['ASSETS_URL_PATH'] + '/<path:filename>',
+                     'assets', serve)
+    app.jinja_env.globals.update(asset_url=asset_url, bundle_urls=bundle_urls)
+    app.cli.add_command(assets_group)
+
+
+def asset_url(filename):
+    """URL of the built copy of static/`filename`, or of the file itself."""
+    built = current_app.extensions['assets'].get(filename)
+    if built is None:
+        return url_for('static', filename=filename)
+    return url_for('assets', filename=built)
+
+
+def bundle_urls(name):
+    """URLs to load bundle `name`: the built bundle, or each of its sources."""
+    built = current_app.extensions['assets'].get(name)
+    if built is None:
+        return [asset_url(source) for source in BUNDLES[name]]
+    return [url_for('assets', filename=built)]
+
+
+def serve(filename):
+    """A built file, precompressed if the client accepts it, cached for good.
+
+    Only names in the manifest are served, so neither the manifest nor a
+    compressed variant can be requested by name.
+    """
+    if filename not in current_app.extensions['assets'].values():
+        abort(404)
+    directory = current_app.config['ASSETS_BUILD_DIR']
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if (request.accept_encodings[candidate]
+                and os.path.exists(os.path.join(directory, filename + suffix))):
+            encoding = candidate
+            break
+    response = send_from_directory(
+        directory, filename + ('' if encoding is None else suffix),
+        mimetype=mimetypes.guess_type(filename)[0])
+    if encoding is not None:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = (
+        f'public, max-age={current_app.config["ASSETS_MAX_AGE"]}, immutable')
+    return response
+
+
+def fingerprint(name, content):
+    """`name` with a hash of `content` before its extension."""
+    root, extension = posixpath.splitext(name)
+    return f'{root}.{hashlib.sha256(content).hexdigest()[:12]}{extension}'
+
+
+def rewrite_css_urls(text, source, target, manifest, static_url):
+    """Point the relative url()s of `source` at their built copies.
+
+    `source` is the file's name in static/ and `target` the name it is
+    built under (the directory is what matters). A reference with no
+    built copy gets its absolute /static URL.
+    """
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        path, query = re.match(r'([^?#]*)(.*)', url).groups()
+        resolved = posixpath.normpath(
+            posixpath.join(posixpath.dirname(source), path))
+        if resolved in manifest:
+            url = posixpath.relpath(manifest[resolved],
+                                    posixpath.dirname(target)) + query
+        else:
+            url = f'{static_url}/{resolved}{query}'
+        return f'url({quote}{url}{quote})'
+    return CSS_URL.sub(replace, text)
+
+
+def minify_css(text):
+    """Drop comments and the whitespace CSS doesn't need.
+
+    Conservative: strings and /*! license comments */ are kept as they
+    are, and parentheses are left alone (`and (` in a media query needs
+    its space).
+    """
+    def drop_comment(match):
+        piece = match.group(0)
+        keep = not piece.startswith('/*') or piece.startswith('/*!')
+        return piece if keep else ' '
+
+    # comments first, so the whitespace on either side collapses together
+    pieces = CSS_VERBATIM.split(CSS_VERBATIM.sub(drop_comment, text))
+    for index in range(0, len(pieces), 2):
+        piece = re.sub(r'\s+', ' ', pieces[index])
+        piece = re.sub(r' ?([{};,]) ?', r'\1', piece)
+        pieces[index] = piece.replace(': ', ':').replace(';}', '}')
+    return ''.join(pieces).strip() + '\n'
+
+
+def minify_js(text, name):
+    """`rjsmin` the sources that aren't minified already, when installed."""
+    if name.endswith('.min.js'):
+        return text
+    try:
+        import rjsmin
+    except ImportError:
+        return text
+    return rjsmin.jsmin(text)
+
+
+def write(directory, name, content):
+    """Write `content` and its compressed variants; return their sizes."""
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    sizes = {'bytes': len(content)}
+    if not name.endswith(COMPRESSIBLE):
+        return sizes
+    variants = {'gzip': ('.gz', gzip.compress(content, 9, mtime=0))}
+    if brotli is not None:
+        variants['br'] = ('.br', brotli.compress(content, quality=11))
+    for encoding, (suffix, compressed) in variants.items():
+        # keep a variant only where it saves at least a tenth
+        if len(compressed) < len(content) * 0.9:
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+            sizes[encoding] = len(compressed)
+    return sizes
+
+
+def build(app):
+    """Build static/ into ASSETS_BUILD_DIR; return the sizes by name."""
+    static, directory = app.static_folder, app.config['ASSETS_BUILD_DIR']
+    static_url = app.static_url_path
+    manifest, sizes = {}, {}
+
+    def emit(name, content):
+        manifest[name] = fingerprint(name, content)
+        sizes[name] = write(directory, manifest[name], content)
+
+    names = sorted(
+        os.path.relpath(os.path.join(root, filename), static).replace(
+            os.sep, '/')
+        for root, _, filenames in os.walk(static)
+        for filename in filenames if not filename.startswith('.'))
+    # CSS last, so its url()s can point at the fonts and images
+    for name in sorted(names, key=lambda name: name.endswith('.css')):
+        with open(os.path.join(static, name), 'rb') as f:
+            content = f.read()
+        if name.endswith('.css'):
+            content = rewrite_css_urls(content.decode(), name, name,
+                                       manifest, static_url).encode()
+        emit(name, content)
+
+    for name, sources in BUNDLES.items():
+        texts = []
+        for source in sources:
+            with open(os.path.join(static, source), encoding='utf-8') as f:
+                text = f.read()
+            if name.endswith('.css'):
+                texts.append(rewrite_css_urls(text, source, name, manifest,
+                                              static_url))
+            else:
+                # a later file must not continue an unterminated statement
+                texts.append(minify_js(text, source).rstrip() + '\n;')
+        joined = '\n'.join(texts)
+        emit(name, (minify_css(joined) if name.endswith('.css')
+                    else joined + '\n').encode())
+
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return sizes
+
+
+@assets_group.command('build')
+@click.option('--clean', is_flag=True,
+              help='Delete ASSETS_BUILD_DIR, and earlier builds, first.')
+def build_command(clean):
+    """Bundle, fingerprint and precompress static/ into ASSETS_BUILD_DIR."""
+    app = current_app._get_current_object()
+    directory = app.config['ASSETS_BUILD_DIR']
+    if clean and os.path.isdir(directory):
+        shutil.rmtree(directory)
+    sizes = build(app)
+    for name in BUNDLES:
+        raw = sum(os.path.getsize(os.path.join(app.static_folder, source))
+                  for source in BUNDLES[name])
+        built = sizes[name]
+        click.echo(f'{name:<14} {len(BUNDLES[name])} files {raw:>8} B -> '
+                   f'{built["bytes"]:>8} B, gzip {built.get("gzip", "-"):>7}, '
+                   f'br {built.get("br", "-"):>7}')
+    click.echo(f'{len(sizes)} assets written to {directory}'
+               + ('' if brotli else ' (no brotli: install it for .br files)'))
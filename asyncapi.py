@@ -0,0 +1,174 @@
+"""JSON endpoints that run their independent queries concurrently.
+
+The views are coroutines: the past and upcoming halves of a show listing,
+or the venue, artist and show searches, are awaited together with
+`asyncio.gather`, each on its own connection. They need the optional
+async stack:
+
+    pip install "asgiref>=3.5" asyncpg       # PostgreSQL
+    pip install "asgiref>=3.5" aiosqlite     # SQLite, for tests
+
+Under a WSGI server Flask runs each async view in an event loop of its
+own, so connections cannot be pooled across requests. Serve the app
+through the ASGI adapter in asgi.py instead and every view shares the
+server's loop, and with it a connection pool.
+"""
+import asyncio
+import importlib.util
+import json
+import weakref
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, current_app, request
+from sqlalchemy import func, or_, select
+from sqlalchemy.pool import NullPool
+
+import search
+from models import Artist, Show, Venue
+from queries import show_page_args
+
+DRIVERS = {'postgresql': 'asyncpg', 'sqlite': 'aiosqlite'}
+
+venues = Venue.__table__
+artists = Artist.__table__
+shows = Show.__table__
+
+bp = Blueprint('async_api', __name__, url_prefix='/api/v1')
+
+# one engine per event loop: asyncpg connections belong to the loop that
+# opened them
+_engines = weakref.WeakKeyDictionary()
+
+
+def async_url(url):
+    """`url` with its driver swapped for the async one."""
+    backend = url.split(':', 1)[0].split('+', 1)[0]
+    if backend == 'postgres':
+        backend = 'postgresql'
+    if backend not in DRIVERS:
+        raise ValueError(f'no async driver for {backend}')
+    return f"{backend}+{DRIVERS[backend]}:{url.split(':', 1)[1]}"
+
+
+def available(config):
+    """Whether asgiref and the async driver for the database are installed."""
+    backend = config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0].split('+')[0]
+    driver = DRIVERS.get('postgresql' if backend == 'postgres' else backend)
+    return all(importlib.util.find_spec(name) is not None
+               for name in ('asgiref', driver or 'missing'))
+
+
+def get_engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    loop = asyncio.get_running_loop()
+    engine = _engines.get(loop)
+    if engine is None:
+        config = current_app.config
+        url = async_url(config['SQLALCHEMY_DATABASE_URI'])
+        if config['ASYNC_DB_POOLED'] and not url.startswith('sqlite'):
+            options = {'pool_size': config['DB_POOL_SIZE'],
+                       'max_overflow': config['DB_MAX_OVERFLOW'],
+                       'pool_timeout': config['DB_POOL_TIMEOUT'],
+                       'pool_recycle': config['DB_POOL_RECYCLE'],
+                       'pool_pre_ping': config['DB_POOL_PRE_PING']}
+        else:
+            options = {'poolclass': NullPool}
+        engine = _engines[loop] = create_async_engine(url, **options)
+    return engine
+
+
+async def fetch(statement, params=None):
+    async with get_engine().connect() as connection:
+        result = await connection.execute(statement, params or {})
+        return result.all()
+
+
+def json_response(data, status=200):
+    return Response(json.dumps(data, default=datetime.isoformat),
+                    status=status, mimetype='application/json')
+
+
+async def one_side(other, key, entity_id, upcoming, now, page, limit):
+    """One page of past or upcoming shows, with the side's total.
+
+    Like `queries.split_shows`, the side's first row is always fetched as
+    well, so the total is known even when the page is out of range.
+    """
+    prefix = other.name.lower()
+    if upcoming:
+        side = shows.c.start_time > now
+        order = (shows.c.start_time, shows.c.id)
+    else:
+        side = shows.c.start_time <= now
+        order = (shows.c.start_time.desc(), shows.c.id.desc())
+    ranked = select(
+        shows.c.id.label('show_id'), shows.c.start_time,
+        other.c.id.label(f'{prefix}_id'),
+        other.c.name.label(f'{prefix}_name'),
+        other.c.image_link.label(f'{prefix}_image_link'),
+        func.row_number().over(order_by=order).label('position'),
+        func.count().over().label('total')).join(
+        other, other.c.id == shows.c[f'{prefix}_id']).where(
+        shows.c[key] == entity_id, side).subquery()
+    offset = (page - 1) * limit
+    rows = await fetch(select(ranked).where(or_(
+        ranked.c.position == 1,
+        ranked.c.position.between(offset + 1, offset + limit))).order_by(
+        ranked.c.position))
+    total = rows[0].total if rows else 0
+    return [{k: v for k, v in row._mapping.items()
+             if k not in ('position', 'total')}
+            for row in rows if row.position > offset], total
+
+
+async def entity_shows(table, other, key, entity_id):
+    now = datetime.now()
+    pages = show_page_args()
+    entity, (upcoming, upcoming_count), (past, past_count) = \
+        await asyncio.gather(
+            fetch(select(table.c.id, table.c.name).where(
+                table.c.id == entity_id)),
+            one_side(other, key, entity_id, True, now,
+                     pages['upcoming_page'], pages['upcoming_limit']),
+            one_side(other, key, entity_id, False, now,
+                     pages['past_page'], pages['past_limit']))
+    if not entity:
+        abort(404)
+    return json_response({
+        'id': entity[0].id, 'name': entity[0].name,
+        'upcoming_shows': upcoming, 'upcoming_shows_count': upcoming_count,
+        'past_shows': past, 'past_shows_count': past_count, **pages})
+
+
+@bp.route('/venues/<int:venue_id>/shows')
+async def venue_shows(venue_id):
+    """A venue's upcoming and past shows, fetched concurrently."""
+    return await entity_shows(venues, artists, 'venue_id', venue_id)
+
+
+@bp.route('/artists/<int:artist_id>/shows')
+async def artist_shows(artist_id):
+    """An artist's upcoming and past shows, fetched concurrently."""
+    return await entity_shows(artists, venues, 'artist_id', artist_id)
+
+
+@bp.route('/search')
+async def search_all():
+    """Venues, artists and shows matching ?q=, searched concurrently."""
+    term = request.args.get('q', '')
+    limit = min(max(request.args.get(
+        'limit', current_app.config['SEARCH_PAGE_SIZE'], type=int), 1),
+        current_app.config['MAX_SEARCH_PAGE_SIZE'])
+    engine = search.engine_class(get_engine().dialect.name)
+
+    async def one(kind):
+        prepared = engine.prepare(kind, term, limit)
+        if prepared is None:
+            return 0, []
+        return engine.results(await fetch(*prepared))
+
+    results = await asyncio.gather(*[one(kind) for kind in search.KINDS])
+    return json_response({
+        kind: {'count': count, 'data': [dict(row._mapping) for row in rows]}
+        for kind, (count, rows) in zip(search.KINDS, results)})
@@ -0,0 +1,91 @@
+"""Page weight of the home page's assets, from static/ and from a build.
+
+    python benchmarks/bench_assets.py
+    python benchmarks/bench_assets.py --accept-encoding gzip -o assets.json
+
+Runs `assets.build` into a scratch ASSETS_BUILD_DIR, then loads / from two
+apps through the test client: one linking to the sources in static/ (no
+manifest), one to the build. For each it fetches every local stylesheet,
+script and image the page links to, with --accept-encoding. It reports
+the requests made and the bytes transferred, in all and for CSS and JS,
+and how many of them a browser must revalidate on the next visit: all of
+those without a max-age, none of the immutable ones. ico/ has no files, so the favicon
+links 404 in both and are left out.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)),
+                os.path.join(os.path.dirname(__file__), os.pardir)]
+
+from bench_routes import commit  # noqa: E402
+
+LINKS = re.compile(r'(?:href|src)="(/(?:assets|static)/[^"]+)"')
+
+
+def page_weight(app, accept_encoding):
+    client = app.test_client()
+    html = client.get('/').get_data(as_text=True)
+    result = {'requests': 0, 'bytes': 0, 'css_js_bytes': 0,
+              'revalidated_next_visit': 0, 'files': {}}
+    for url in dict.fromkeys(LINKS.findall(html)):
+        response = client.get(url, headers={'Accept-Encoding': accept_encoding})
+        if response.status_code == 404:
+            continue
+        size = len(response.get_data())
+        result['requests'] += 1
+        result['bytes'] += size
+        if url.endswith(('.css', '.js')):
+            result['css_js_bytes'] += size
+        if 'max-age' not in response.headers.get('Cache-Control', ''):
+            result['revalidated_next_visit'] += 1
+        result['files'][url] = {
+            'bytes': size,
+            'encoding': response.headers.get('Content-Encoding', 'identity')}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accept-encoding', default='br, gzip')
+    parser.add_argument('-o', '--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch}/bench.db'
+    os.environ['ASSETS_BUILD_DIR'] = os.path.join(scratch, 'dist')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    import assets
+    import config
+    from app import create_app
+
+    settings = type('BenchConfig', (config.ProductionConfig,),
+                    {'TEMPLATE_CACHE_DIR': ''})
+    assets.build(create_app(settings))
+    sources = create_app(settings)
+    sources.extensions['assets'] = {}
+    report = {'commit': commit(), 'accept_encoding': args.accept_encoding,
+              'static': page_weight(sources, args.accept_encoding),
+              'built': page_weight(create_app(settings), args.accept_encoding)}
+    for mode in ('static', 'built'):
+        result = report[mode]
+        print(f'{mode:<7} {result["requests"]:>3} requests '
+              f'{result["bytes"] / 1024:>9.1f} KiB '
+              f'({result["css_js_bytes"] / 1024:.1f} KiB CSS and JS), '
+              f'{result["revalidated_next_visit"]} revalidated next visit',
+              file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Sync views against the asyncio.gather endpoints, under concurrency.
+
+    python benchmarks/bench_async.py --concurrency 1 16 64
+    python benchmarks/bench_async.py --url postgresql://... --asgi
+
+Seeds a scratch database (SQLite by default, or --url), then hits the
+same data through two sets of JSON endpoints:
+
+* sync: Flask views that run the show split and the three searches one
+  after the other, as the HTML pages do;
+* async: asyncapi's views, which await the queries concurrently.
+
+Requests go over HTTP from client threads: to a threaded WSGI server by
+default, or with --asgi to uvicorn serving asgi.application (pooled async
+connections). Latency percentiles are in milliseconds.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)),
+                os.path.join(os.path.dirname(__file__), os.pardir)]
+
+from bench_routes import http_request, percentile  # noqa: E402
+
+
+def add_sync_views(app):
+    """JSON twins of the async endpoints, built on the synchronous queries."""
+    from flask import Response, request
+
+    import search
+    from extensions import db
+    from queries import show_page_args, venue_detail
+
+    def as_json(data):
+        return Response(json.dumps(data, default=str),
+                        mimetype='application/json')
+
+    @app.route('/bench/sync/venues/<int:venue_id>/shows')
+    def bench_sync_venue_shows(venue_id):
+        return as_json(venue_detail(venue_id, **show_page_args()))
+
+    @app.route('/bench/sync/search')
+    def bench_sync_search():
+        results = search.engine_for(db.session).search_all(
+            request.args.get('q', ''))
+        return as_json({kind: {'count': count,
+                               'data': [dict(r._mapping) for r in rows]}
+                        for kind, (count, rows) in results.items()})
+
+
+def serve_wsgi(app):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True,
+                         request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server.shutdown
+
+
+def serve_asgi(application):
+    import uvicorn
+
+    config = uvicorn.Config(application, host='127.0.0.1', port=8765,
+                            log_level='warning')
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+    return 'http://127.0.0.1:8765', stop
+
+
+def load(send, path, requests, concurrency):
+    def one(_):
+        started = time.perf_counter()
+        status = send('GET', path, None)
+        return time.perf_counter() - started, status >= 400
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    timings = sorted(t for t, _ in results)
+    return {'p50_ms': round(percentile(timings, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+            'throughput_rps': round(len(results) / elapsed, 1),
+            'errors': sum(error for _, error in results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url')
+    parser.add_argument('--venues', type=int, default=200)
+    parser.add_argument('--artists', type=int, default=600)
+    parser.add_argument('--shows', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 16, 64])
+    parser.add_argument('--requests', type=int, default=400,
+                        help='requests per endpoint and concurrency level')
+    parser.add_argument('--asgi', action='store_true',
+                        help='serve through uvicorn and asgi.py')
+    parser.add_argument('-o', '--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = args.url or f'sqlite:///{scratch}'
+    os.environ.setdefault('FYYUR_ENV', 'production')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    from extensions import db
+    from models import Show
+    from views.admin import seed_database
+    if args.asgi:
+        import asgi
+        app = asgi.app
+    else:
+        from app import create_app
+        app = create_app()
+    if 'async_api' not in app.blueprints:
+        sys.exit('asyncapi is not registered: install asgiref and the async '
+                 'driver (aiosqlite or asyncpg)')
+    add_sync_views(app)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_database(args.venues, args.artists, args.shows)
+        venue_id = db.session.query(Show.venue_id).group_by(
+            Show.venue_id).order_by(db.func.count().desc()).limit(1).scalar()
+        db.session.remove()
+
+    pairs = {
+        'venue_shows': (f'/bench/sync/venues/{venue_id}/shows',
+                        f'/api/v1/venues/{venue_id}/shows'),
+        'search': ('/bench/sync/search?q=the', '/api/v1/search?q=the'),
+    }
+    base, stop = serve_asgi(asgi.application) if args.asgi else serve_wsgi(app)
+    send = http_request(base)
+    report = {'server': 'asgi' if args.asgi else 'wsgi', 'results': {}}
+    try:
+        print(f'{"endpoint":<12} {"conc":>4} {"mode":<5} {"p50":>8} '
+              f'{"p95":>8} {"p99":>8} {"rps":>8}', file=sys.stderr)
+        for name, paths in pairs.items():
+            for concurrency in args.concurrency:
+                for mode, path in zip(('sync', 'async'), paths):
+                    send('GET', path, None)
+                    result = load(send, path, args.requests, concurrency)
+                    report['results'].setdefault(name, {}).setdefault(
+                        str(concurrency), {})[mode] = result
+                    print(f'{name:<12} {concurrency:>4} {mode:<5} '
+                          f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                          f"{result['p99_ms']:8.2f} "
+                          f"{result['throughput_rps']:8.1f}", file=sys.stderr)
+    finally:
+        stop()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
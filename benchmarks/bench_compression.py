@@ -0,0 +1,166 @@
+"""Response compression: bytes on the wire, latency and CPU per response.
+
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --url postgresql://... -o gz.json
+
+Seeds a scratch database (SQLite by default, or --url) and serves the app
+over HTTP. The large pages are fetched with Accept-Encoding identity, gzip
+and br (when brotli is installed). For each, the report gives the median
+time to headers and to the last byte, the bytes received, and the mean
+CPU time and compression ratio per response, read from the middleware's
+histograms.
+
+It then re-compresses each page's identity body offline, in the same
+STREAM_BUFFER_SIZE chunks the streamed listings use. This is done at
+several gzip levels and brotli qualities, so the COMPRESS_* defaults can
+be weighed against the alternatives.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)),
+                os.path.join(os.path.dirname(__file__), os.pardir)]
+
+from bench_async import serve_wsgi  # noqa: E402
+from bench_routes import commit  # noqa: E402
+
+PATHS = ['/shows?limit=200', '/artists?limit=200', '/venues',
+         '/api/v1/shows.ndjson']
+LEVELS = {'gzip': [1, 6, 9], 'br': [1, 4, 6, 11]}
+
+
+def fetch(port, path, encoding):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    started = time.perf_counter()
+    connection.request('GET', path, headers={'Accept-Encoding': encoding})
+    response = connection.getresponse()
+    first = time.perf_counter()
+    body = response.read()
+    last = time.perf_counter()
+    connection.close()
+    assert response.status == 200, (path, response.status)
+    assert response.headers.get('Content-Encoding', 'identity') == encoding, (
+        path, encoding, response.headers.get('Content-Encoding'))
+    return (first - started) * 1000, (last - started) * 1000, body
+
+
+def histogram_totals(histogram, encoding):
+    """`(count, sum)` of `histogram` for `encoding`, so far."""
+    for labels, (counts, total) in histogram.samples():
+        if labels == (encoding,):
+            return sum(counts), total
+    return 0, 0.0
+
+
+def offline(body, encoding, level, chunk_size):
+    import compression
+
+    stream = (compression.GzipStream(level) if encoding == 'gzip'
+              else compression.BrotliStream(level))
+    size = 0
+    started = time.thread_time()
+    for offset in range(0, len(body), chunk_size):
+        size += len(stream.compress(body[offset:offset + chunk_size], True))
+    size += len(stream.finish())
+    return (time.thread_time() - started) * 1000, size / len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url')
+    parser.add_argument('--venues', type=int, default=200)
+    parser.add_argument('--artists', type=int, default=2000)
+    parser.add_argument('--shows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('-o', '--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = args.url or f'sqlite:///{scratch}'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    import compression
+    import config
+    from app import create_app
+    from extensions import db
+    from views.admin import seed_database
+
+    app = create_app(type('BenchConfig', (config.ProductionConfig,), {
+        'TEMPLATE_CACHE_DIR': '', 'COMPRESS': True}))
+    middleware = app.wsgi_app
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_database(args.venues, args.artists, args.shows)
+        db.session.remove()
+
+    encodings = ['identity', 'gzip'] + (['br'] if compression.brotli else [])
+    base, stop = serve_wsgi(app)
+    port = int(base.rsplit(':', 1)[1])
+    report = {'commit': commit(), 'served': {}, 'offline': {}}
+    bodies = {}
+    print(f'{"path":<22} {"encoding":<9} {"ttfb":>7} {"total":>7} '
+          f'{"KiB":>8} {"cpu ms":>7} {"ratio":>6}', file=sys.stderr)
+    try:
+        for path in PATHS:
+            for encoding in encodings:
+                fetch(port, path, encoding)
+                if encoding != 'identity':
+                    cpu_before = histogram_totals(middleware.cpu_seconds,
+                                                  encoding)
+                    ratio_before = histogram_totals(middleware.ratios,
+                                                    encoding)
+                runs = [fetch(port, path, encoding)
+                        for _ in range(args.repeat)]
+                result = {
+                    'ttfb_ms': round(statistics.median(r[0] for r in runs), 2),
+                    'total_ms': round(statistics.median(r[1] for r in runs), 2),
+                    'bytes': len(runs[0][2])}
+                if encoding == 'identity':
+                    bodies[path] = runs[0][2]
+                else:
+                    count, cpu = histogram_totals(middleware.cpu_seconds,
+                                                  encoding)
+                    _, ratio = histogram_totals(middleware.ratios, encoding)
+                    count -= cpu_before[0]
+                    result['cpu_ms'] = round(
+                        (cpu - cpu_before[1]) / count * 1000, 3)
+                    result['ratio'] = round((ratio - ratio_before[1]) / count,
+                                            4)
+                report['served'].setdefault(path, {})[encoding] = result
+                print(f'{path:<22} {encoding:<9} {result["ttfb_ms"]:7.2f} '
+                      f'{result["total_ms"]:7.2f} '
+                      f'{result["bytes"] / 1024:8.1f} '
+                      f'{result.get("cpu_ms", 0):7.3f} '
+                      f'{result.get("ratio", 1):6.3f}', file=sys.stderr)
+    finally:
+        stop()
+
+    chunk_size = app.config['STREAM_BUFFER_SIZE']
+    print(f'\n{"path":<22} {"level":<9} {"cpu ms":>7} {"ratio":>6}',
+          file=sys.stderr)
+    for path, body in bodies.items():
+        for encoding in encodings[1:]:
+            for level in LEVELS[encoding]:
+                cpu, ratio = offline(body, encoding, level, chunk_size)
+                report['offline'].setdefault(path, {})[
+                    f'{encoding}-{level}'] = {'cpu_ms': round(cpu, 3),
+                                              'ratio': round(ratio, 4)}
+                print(f'{path:<22} {f"{encoding}-{level}":<9} {cpu:7.3f} '
+                      f'{ratio:6.3f}', file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Render time of the `datetime` filter for a page of 10k shows.
+
+    python benchmarks/bench_datetime_filter.py --shows 10000
+
+Compares the old round trip (strftime in the view, dateutil.parser.parse
+and babel.dates.format_datetime in the filter) with the memoized filter
+that formats native datetimes.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+from jinja2 import Environment
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+TEMPLATE = '''{% for show in shows %}
+<h4>{{ show.start_time|datetime('full') }}</h4>
+{% endfor %}'''
+
+
+def old_format_datetime(value, format='medium'):
+    date = dateutil.parser.parse(value)
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale='en')
+
+
+def render(filter, shows, repeat):
+    env = Environment()
+    env.filters['datetime'] = filter
+    template = env.from_string(TEMPLATE)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        template.render(shows=shows())
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from filters import format_datetime
+
+    start = datetime(2026, 1, 1, 20, 0)
+    times = [start + timedelta(hours=7 * i) for i in range(args.shows)]
+
+    def as_strings():
+        return [{'start_time': t.strftime("%Y-%m-%dT%H:%M:%S%Z")}
+                for t in times]
+
+    def as_datetimes():
+        return [{'start_time': t} for t in times]
+
+    old = render(old_format_datetime, as_strings, args.repeat)
+    new = render(format_datetime, as_datetimes, args.repeat)
+    print(f'strftime + parse + format_datetime: {old:9.1f} ms')
+    print(f'native datetime + cached pattern:   {new:9.1f} ms')
+    print(f'speedup: {old / new:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
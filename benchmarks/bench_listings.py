@@ -0,0 +1,70 @@
+"""Latency of the keyset-paginated listings as the tables grow.
+
+    python benchmarks/bench_listings.py --sizes 1000 10000 100000
+
+For each size the script reseeds a scratch database (SQLite by default,
+or --url) with `flask seed`'s generator and times the first page and a
+page 90% of the way through /shows, /artists and /venues. Flat numbers
+across sizes mean the pages do not depend on table size.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def timed(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (url, response.status_code)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = args.url or f'sqlite:///{scratch}'
+    from app import create_app
+    from extensions import db
+    from models import Artist, Show, Venue
+    from views.admin import seed_database
+    from pagination import encode_cursor
+
+    deep = {
+        '/shows': (Show, [Show.start_time, Show.id]),
+        '/artists': (Artist, [Artist.name, Artist.id]),
+        '/venues': (Venue, [Venue.state, Venue.city, Venue.name, Venue.id]),
+    }
+    print(f'{"shows":>8} {"route":<10} {"first ms":>9} {"deep ms":>9}')
+    app = create_app()
+    with app.app_context():
+        for size in args.sizes:
+            db.drop_all()
+            db.create_all()
+            seed_database(max(size // 10, 1), max(size // 10, 1), size)
+            client = app.test_client()
+            for route, (model, columns) in deep.items():
+                total = db.session.query(model).count()
+                row = db.session.query(*columns).order_by(*columns).offset(
+                    int(total * 0.9)).first()
+                cursor = encode_cursor(list(row))
+                first = timed(client, route, args.repeat)
+                later = timed(client, f'{route}?cursor={cursor}', args.repeat)
+                print(f'{size:>8} {route:<10} {first:>9.2f} {later:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Latency, throughput and query counts for every route, as JSON.
+
+    python benchmarks/bench_routes.py --venues 200 --artists 600 --shows 10000
+    python benchmarks/bench_routes.py --server --concurrency 4 -o after.json
+
+Seeds a scratch database (SQLite by default, or --url) with `flask seed`'s
+generator, then drives each route through the Flask test client and, with
+--server, through a local threaded WSGI server over HTTP. The report has
+p50/p95/p99 latency in milliseconds, requests per second and SQL
+statements per request for each route, plus the commit it was taken at,
+so runs can be compared across commits:
+
+    python benchmarks/bench_routes.py -o before.json
+    git checkout other-branch
+    python benchmarks/bench_routes.py -o after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+class StatementCounter(object):
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def percentile(sorted_values, share):
+    index = min(len(sorted_values) - 1,
+                max(0, round(share * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(timings, errors, elapsed, statements):
+    timings = sorted(timings)
+    requests = len(timings)
+    return {'requests': requests,
+            'errors': errors,
+            'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'throughput_rps': round(requests / elapsed, 1),
+            'queries_per_request': round(statements / requests, 2)}
+
+
+def routes():
+    """`(name, method, path, form)` for every route worth timing."""
+    from extensions import db
+    from models import Artist, Show, Venue
+    busiest_venue = db.session.query(Show.venue_id).group_by(
+        Show.venue_id).order_by(db.func.count().desc()).limit(1).scalar()
+    busiest_artist = db.session.query(Show.artist_id).group_by(
+        Show.artist_id).order_by(db.func.count().desc()).limit(1).scalar()
+    venue = db.session.get(Venue, busiest_venue)
+    artist = db.session.get(Artist, busiest_artist)
+    show_id = db.session.query(db.func.max(Show.id)).scalar()
+    since = (datetime.now() - timedelta(days=7)).isoformat()
+    new_show = {'venue_id': venue.id, 'artist_id': artist.id,
+                'start_time': (datetime.now() + timedelta(days=30))
+                .strftime('%Y-%m-%d %H:%M:%S')}
+    new_venue = {'name': 'Bench Hall', 'city': 'Austin', 'state': 'TX',
+                 'address': '1 Main St', 'phone': '512-555-0100',
+                 'genres': 'Jazz', 'facebook_link': 'https://facebook.com/x'}
+    new_artist = {'name': 'Bench Trio', 'city': 'Austin', 'state': 'TX',
+                  'phone': '512-555-0101', 'genres': 'Jazz',
+                  'facebook_link': 'https://facebook.com/users/10203040'}
+    term = venue.name.split()[1]
+    return [
+        ('home', 'GET', '/', None),
+        ('venues', 'GET', '/venues', None),
+        ('artists', 'GET', '/artists', None),
+        ('shows', 'GET', '/shows', None),
+        ('venue_detail', 'GET', f'/venues/{venue.id}', None),
+        ('venue_detail_page2', 'GET',
+         f'/venues/{venue.id}?past_page=2', None),
+        ('artist_detail', 'GET', f'/artists/{artist.id}', None),
+        ('show_detail', 'GET', f'/shows/{show_id}', None),
+        ('venue_edit_form', 'GET', f'/venues/{venue.id}/edit', None),
+        ('artist_edit_form', 'GET', f'/artists/{artist.id}/edit', None),
+        ('search_all', 'GET', f'/search?q={urllib.parse.quote(term)}', None),
+        ('search_venues', 'POST', '/venues/search', {'search_term': term}),
+        ('search_artists', 'POST', '/artists/search',
+         {'search_term': artist.name.split()[0]}),
+        ('search_shows', 'POST', '/shows/search', {'search_term': term}),
+        ('venue_create_form', 'GET', '/venues/create', None),
+        ('artist_create_form', 'GET', '/artists/create', None),
+        ('show_create_form', 'GET', '/shows/create', None),
+        ('venue_create', 'POST', '/venues/create', new_venue),
+        ('artist_create', 'POST', '/artists/create', new_artist),
+        ('show_create', 'POST', '/shows/create', new_show),
+        ('export_shows', 'GET', f'/api/v1/shows.ndjson?since={since}', None),
+        ('metrics', 'GET', '/metrics', None),
+    ]
+
+
+def client_request(client):
+    def send(method, path, form):
+        response = client.open(path, method=method, data=form)
+        response.get_data()
+        return response.status_code
+    return send
+
+
+def http_request(base):
+    def send(method, path, form):
+        data = urllib.parse.urlencode(form, doseq=True).encode() if form \
+            else None
+        request = urllib.request.Request(base + path, data=data,
+                                         method=method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+    return send
+
+
+def run(send, route, requests, warmup, concurrency, counter):
+    name, method, path, form = route
+    for _ in range(warmup):
+        send(method, path, form)
+
+    def one(_):
+        started = time.perf_counter()
+        status = send(method, path, form)
+        return time.perf_counter() - started, status >= 400
+
+    counter.count = 0
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(one, range(requests)))
+    else:
+        results = [one(i) for i in range(requests)]
+    elapsed = time.perf_counter() - started
+    return summarize([t for t, _ in results], sum(e for _, e in results),
+                     elapsed, counter.count)
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], text=True,
+            stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='database URL; a scratch SQLite file '
+                        'by default')
+    parser.add_argument('--venues', type=int, default=200)
+    parser.add_argument('--artists', type=int, default=600)
+    parser.add_argument('--shows', type=int, default=10000)
+    parser.add_argument('--random-seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=100,
+                        help='timed requests per route')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--server', action='store_true',
+                        help='also time the routes over HTTP')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='client threads for the HTTP run')
+    parser.add_argument('--only', nargs='+', metavar='ROUTE',
+                        help='time only these routes')
+    parser.add_argument('-o', '--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = args.url or f'sqlite:///{scratch}'
+    os.environ.setdefault('FYYUR_ENV', 'production')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    from sqlalchemy import event
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    from app import create_app
+    from extensions import db
+    from views.admin import seed_database
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    counter = StatementCounter()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_database(args.venues, args.artists, args.shows,
+                      args.random_seed)
+        event.listen(db.engine, 'before_cursor_execute', counter)
+        selected = [r for r in routes()
+                    if not args.only or r[0] in args.only]
+        backend = db.engine.url.get_backend_name()
+        db.session.remove()
+
+    report = {'commit': commit(),
+              'taken_at': datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(),
+              'database': backend,
+              'data': {'venues': args.venues, 'artists': args.artists,
+                       'shows': args.shows, 'random_seed': args.random_seed},
+              'requests': args.requests,
+              'results': {}}
+
+    modes = [('test_client', client_request(app.test_client()), 1)]
+    server = None
+    if args.server:
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server('127.0.0.1', 0, app, threaded=True,
+                             request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        modes.append(('wsgi_server',
+                      http_request(f'http://127.0.0.1:{server.server_port}'),
+                      args.concurrency))
+    try:
+        for mode, send, concurrency in modes:
+            results = report['results'][mode] = {}
+            for route in selected:
+                results[route[0]] = run(send, route, args.requests,
+                                        args.warmup, concurrency, counter)
+                print(f'{mode:<12} {route[0]:<20} '
+                      f"p50 {results[route[0]]['p50_ms']:8.2f} ms  "
+                      f"p99 {results[route[0]]['p99_ms']:8.2f} ms  "
+                      f"{results[route[0]]['queries_per_request']:6.1f} q/req",
+                      file=sys.stderr)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Cold start of a worker: import time and time to first response, as JSON.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --path /venues -o startup.json
+    python benchmarks/bench_startup.py --path /shows --compile-templates
+
+Each run is a fresh interpreter, as a new gunicorn worker or a `flask`
+command would be. It runs under `python -X importtime`, imports `app`,
+calls `create_app()` and serves one request to --path through the test
+client. For every run the report records the milliseconds spent
+importing, building the app, answering the first request, and from
+process spawn to that first response. The medians, and the slowest
+top-level imports of the first run, come with them.
+
+Templates are compiled in each run unless --compile-templates, which
+runs `flask templates compile` into a scratch TEMPLATE_CACHE_DIR first,
+as a deploy would.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from bench_routes import commit  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+WORKER = '''
+import json, os, sys, time
+started = time.time()
+from app import create_app
+imported = time.time()
+app = create_app()
+created = time.time()
+response = app.test_client().get(sys.argv[1])
+answered = time.time()
+spawned = float(os.environ['BENCH_SPAWNED'])
+print(json.dumps({
+    'status': response.status_code,
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (answered - created) * 1000,
+    'spawn_to_response_ms': (answered - spawned) * 1000}))
+'''
+
+
+def parse_importtime(stderr):
+    """`(module, cumulative_ms)` for the top-level imports, slowest first."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # nested imports are indented under the module that pulled them in
+        if not name[1:].startswith(' '):
+            imports.append((name.strip(), int(cumulative) / 1000))
+    return sorted(imports, key=lambda item: -item[1])
+
+
+def run(path, env):
+    env = dict(env, BENCH_SPAWNED=repr(time.time()))
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', WORKER, path],
+        cwd=ROOT, env=env, capture_output=True, text=True)
+    if process.returncode:
+        sys.exit(process.stderr)
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    return result, parse_importtime(process.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/',
+                        help='route for the first request')
+    parser.add_argument('--top', type=int, default=15,
+                        help='how many top-level imports to list')
+    parser.add_argument('--compile-templates', action='store_true',
+                        help='precompile into a bytecode cache first')
+    parser.add_argument('-o', '--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    env = dict(os.environ, DATABASE_URL=args.url or f'sqlite:///{scratch}')
+    env.setdefault('FYYUR_ENV', 'production')
+    env.setdefault('SECRET_KEY', 'benchmark')
+    env['TEMPLATE_CACHE_DIR'] = ''
+    if not args.url:
+        subprocess.run([sys.executable, '-c', (
+            'from app import create_app; from extensions import db; '
+            'import models; app = create_app(); '
+            'app.app_context().push(); db.create_all()')],
+            cwd=ROOT, env=env, check=True, capture_output=True)
+    if args.compile_templates:
+        env['TEMPLATE_CACHE_DIR'] = scratch + '.templates'
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'app',
+                        'templates', 'compile'],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+
+    runs, imports = [], None
+    for _ in range(args.runs):
+        result, top = run(args.path, env)
+        runs.append(result)
+        imports = imports or top
+    keys = ('import_ms', 'create_app_ms', 'first_request_ms',
+            'spawn_to_response_ms')
+    report = {
+        'commit': commit(),
+        'python': sys.version.split()[0],
+        'path': args.path,
+        'compiled_templates': args.compile_templates,
+        'runs': [{k: (round(v, 1) if k in keys else v)
+                  for k, v in r.items()} for r in runs],
+        'median': {k: round(statistics.median(r[k] for r in runs), 1)
+                   for k in keys},
+        'slowest_imports_ms': [(name, round(ms, 1))
+                               for name, ms in imports[:args.top]],
+    }
+    for key in keys:
+        print(f'{key:<22} {report["median"][key]:8.1f}', file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Time to first byte and peak memory of streamed against buffered listings.
+
+    python benchmarks/bench_streaming.py --limit 50 200 2000
+    python benchmarks/bench_streaming.py --url postgresql://... -o stream.json
+
+Seeds a scratch database (SQLite by default, or --url) and serves the
+same data from two apps over HTTP: one with STREAM_TEMPLATES on, one with
+it off. MAX_LISTING_PAGE_SIZE is raised to the largest --limit so page
+size can be pushed past the production cap. For each page size, /shows
+and /artists are fetched --repeat times; the report has the median time
+to the response headers (which go out with the first chunk of the body),
+the median time to the last byte, and the peak memory Python allocated
+while serving one request, from tracemalloc.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__)),
+                os.path.join(os.path.dirname(__file__), os.pardir)]
+
+from bench_async import serve_wsgi  # noqa: E402
+from bench_routes import commit  # noqa: E402
+
+
+def fetch(port, path):
+    """`(ms to headers, ms to last byte, bytes, peak KiB allocated)`."""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    connection.request('GET', path)
+    response = connection.getresponse()
+    first = time.perf_counter()
+    # read in pieces, so the client's copy of the page stays out of the peak
+    size = 0
+    while True:
+        piece = response.read(16384)
+        if not piece:
+            break
+        size += len(piece)
+    last = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    connection.close()
+    assert response.status == 200, (path, response.status)
+    return ((first - started) * 1000, (last - started) * 1000, size,
+            peak / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url')
+    parser.add_argument('--venues', type=int, default=200)
+    parser.add_argument('--artists', type=int, default=5000)
+    parser.add_argument('--shows', type=int, default=20000)
+    parser.add_argument('--limit', type=int, nargs='+', default=[50, 200, 2000],
+                        help='page sizes to request')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('-o', '--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = args.url or f'sqlite:///{scratch}'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    import config
+    from app import create_app
+    from extensions import db
+    from views.admin import seed_database
+
+    def settings(stream):
+        return type('BenchConfig', (config.ProductionConfig,), {
+            'STREAM_TEMPLATES': stream, 'TEMPLATE_CACHE_DIR': '',
+            'MAX_LISTING_PAGE_SIZE': max(args.limit)})
+
+    apps = {'streamed': create_app(settings(True)),
+            'buffered': create_app(settings(False))}
+    with apps['streamed'].app_context():
+        db.drop_all()
+        db.create_all()
+        seed_database(args.venues, args.artists, args.shows)
+        db.session.remove()
+
+    servers = {mode: serve_wsgi(app) for mode, app in apps.items()}
+    ports = {mode: int(base.rsplit(':', 1)[1])
+             for mode, (base, _) in servers.items()}
+    tracemalloc.start()
+    report = {'commit': commit(), 'results': {}}
+    print(f'{"path":<24} {"mode":<9} {"ttfb":>8} {"total":>8} {"KiB":>8} '
+          f'{"peak KiB":>9}', file=sys.stderr)
+    try:
+        for limit in args.limit:
+            for listing in ('/shows', '/artists'):
+                path = f'{listing}?limit={limit}'
+                for mode, port in ports.items():
+                    fetch(port, path)
+                    runs = [fetch(port, path) for _ in range(args.repeat)]
+                    result = {
+                        'ttfb_ms': round(statistics.median(
+                            r[0] for r in runs), 2),
+                        'total_ms': round(statistics.median(
+                            r[1] for r in runs), 2),
+                        'bytes': runs[0][2],
+                        'peak_kib': round(max(r[3] for r in runs), 1)}
+                    report['results'].setdefault(path, {})[mode] = result
+                    print(f'{path:<24} {mode:<9} {result["ttfb_ms"]:8.2f} '
+                          f'{result["total_ms"]:8.2f} '
+                          f'{result["bytes"] / 1024:8.1f} '
+                          f'{result["peak_kib"]:9.1f}', file=sys.stderr)
+    finally:
+        tracemalloc.stop()
+        for _, stop in servers.values():
+            stop()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
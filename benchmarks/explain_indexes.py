@@ -0,0 +1,141 @@
+"""EXPLAIN plans and timings for the hot queries, with and without indexes.
+
+Run against a PostgreSQL database that has been migrated with
+`flask db upgrade`:
+
+    python benchmarks/explain_indexes.py --seed --shows 1000000
+
+`--seed` empties the Area, Venue, Artist, shows and genre link tables
+and fills them with generate_series() so a million shows load in seconds.
+The hot-path indexes are dropped for the "before" run and recreated for
+the "after" run.
+"""
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import config  # noqa: E402
+
+INDEXES = {
+    'ix_shows_venue_id_start_time':
+        'CREATE INDEX ix_shows_venue_id_start_time ON shows (venue_id, start_time)',
+    'ix_shows_artist_id_start_time':
+        'CREATE INDEX ix_shows_artist_id_start_time ON shows (artist_id, start_time)',
+    'ix_shows_start_time_id':
+        'CREATE INDEX ix_shows_start_time_id ON shows (start_time, id)',
+    'ix_Venue_state_city_name':
+        'CREATE INDEX "ix_Venue_state_city_name" ON "Venue" (state, city, name, id)',
+    'ix_Artist_name_id':
+        'CREATE INDEX "ix_Artist_name_id" ON "Artist" (name, id)',
+    'ix_Venue_area_id_name':
+        'CREATE INDEX "ix_Venue_area_id_name" ON "Venue" (area_id, name, id)',
+    'ix_Venue_search_vector':
+        'CREATE INDEX "ix_Venue_search_vector" ON "Venue" USING gin (search_vector)',
+    'ix_Artist_search_vector':
+        'CREATE INDEX "ix_Artist_search_vector" ON "Artist" USING gin (search_vector)',
+}
+
+QUERIES = {
+    'venue upcoming shows':
+        'SELECT * FROM shows WHERE venue_id = :venue_id AND start_time > now() '
+        'ORDER BY start_time',
+    'artist past shows':
+        'SELECT * FROM shows WHERE artist_id = :artist_id AND start_time < now() '
+        'ORDER BY start_time DESC',
+    'upcoming shows window':
+        'SELECT count(*) FROM shows WHERE start_time BETWEEN now() '
+        "AND now() + interval '1 day'",
+    'venues in area':
+        'SELECT id, name FROM "Venue" WHERE state = :state AND city = :city',
+    'venues by area id':
+        'SELECT id, name FROM "Venue" WHERE area_id = :area_id '
+        'ORDER BY name, id',
+    'venue name search':
+        'SELECT id, name FROM "Venue" '
+        "WHERE search_vector @@ to_tsquery('simple', :term)",
+    'artist name search':
+        'SELECT id, name FROM "Artist" '
+        "WHERE search_vector @@ to_tsquery('simple', :term)",
+}
+
+PARAMS = {'venue_id': 42, 'artist_id': 42, 'state': 'CA',
+          'city': 'City 7', 'area_id': 8, 'term': '4242:*'}
+
+
+def seed(conn, venues, artists, shows):
+    conn.execute(text(
+        'TRUNCATE shows, artist_genres, venue_genres, "Venue", "Artist", '
+        '"Area" RESTART IDENTITY'))
+    conn.execute(text('UPDATE "Genre" SET artist_count = 0'))
+    # Area i + 1 is 'City i', so venue i gets area 1 + i % 500
+    conn.execute(text(
+        'INSERT INTO "Area" (city, state) '
+        "SELECT 'City ' || i, (ARRAY['CA','NY','TX','WA','IL'])[1 + i % 5] "
+        'FROM generate_series(0, 499) AS i'))
+    conn.execute(text(
+        'INSERT INTO "Venue" (name, city, state, area_id, address, phone) '
+        "SELECT 'Venue ' || i, 'City ' || (i % 500), "
+        "(ARRAY['CA','NY','TX','WA','IL'])[1 + i % 5], 1 + i % 500, "
+        "'Main St', '555-555-5555' "
+        'FROM generate_series(1, :n) AS i'), {'n': venues})
+    conn.execute(text(
+        'INSERT INTO "Artist" (name, city, state, phone) '
+        "SELECT 'Artist ' || i, 'City ' || (i % 500), 'CA', '555-555-5555' "
+        'FROM generate_series(1, :n) AS i'), {'n': artists})
+    conn.execute(text(
+        'INSERT INTO shows (start_time, venue_id, artist_id) '
+        "SELECT now() + (random() * 730 - 365) * interval '1 day', "
+        '1 + (random() * (:venues - 1))::int, 1 + (random() * (:artists - 1))::int '
+        'FROM generate_series(1, :n)'),
+        {'n': shows, 'venues': venues, 'artists': artists})
+
+
+def run(conn, label, repeat):
+    print(f'=== {label} ===')
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text('EXPLAIN ANALYZE ' + sql), PARAMS).scalars().all()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(text(sql), PARAMS).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f'--- {name}: median {timings[len(timings) // 2]:.2f} ms')
+        print('\n'.join(plan))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=os.environ.get(
+        'DATABASE_URL', config.Config.SQLALCHEMY_DATABASE_URI))
+    parser.add_argument('--seed', action='store_true')
+    parser.add_argument('--venues', type=int, default=10000)
+    parser.add_argument('--artists', type=int, default=20000)
+    parser.add_argument('--shows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    with engine.begin() as conn:
+        if args.seed:
+            seed(conn, args.venues, args.artists, args.shows)
+
+    with engine.begin() as conn:
+        for name in INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+        conn.execute(text('ANALYZE'))
+        run(conn, 'before (primary keys only)', args.repeat)
+
+    with engine.begin() as conn:
+        for ddl in INDEXES.values():
+            conn.execute(text(ddl))
+        conn.execute(text('ANALYZE'))
+        run(conn, 'after (hot path indexes)', args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+class BaseCache(object):
+    """Read-through cache with hit, miss and eviction counters.
+
+    Backends implement `_get`, `_set` and `_delete`; `_get` returns the
+    `missing` sentinel when a key is absent or expired.
+    """
+    missing = object()
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self._get(key)
+        if value is self.missing:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self._set(key, value, self.ttl if ttl is None else ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self._delete(keys)
+
+    def get_or_set(self, key, loader, ttl=None):
+        value = self._get(key)
+        if value is not self.missing:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0}
+
+
+class NullCache(BaseCache):
+    """Caches nothing; every lookup is a miss."""
+
+    def _get(self, key):
+        return self.missing
+
+    def _set(self, key, value, ttl):
+        pass
+
+    def _delete(self, keys):
+        pass
+
+
+class LRUCache(BaseCache):
+    """In-process cache bounded by entry count, with per-entry expiry."""
+
+    def __init__(self, max_entries=1024, ttl=60, clock=time.monotonic):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self.missing
+            expires, value = entry
+            if expires is not None and expires <= self.clock():
+                del self._entries[key]
+                self.evictions += 1
+                return self.missing
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        expires = self.clock() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache(BaseCache):
+    """Cache stored in Redis, shared by every worker.
+
+    `client` may be any object with Redis' `get`, `setex` and `delete`
+    methods, which lets tests pass a local stand-in. Expiry and eviction
+    happen inside Redis, so `evictions` is not counted here.
+    """
+
+    def __init__(self, client=None, url=None, ttl=60, prefix='fyyur:'):
+        super().__init__(ttl)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return self.missing
+        return pickle.loads(value)
+
+    def _set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, ttl, pickle.dumps(value))
+
+    def _delete(self, keys):
+        self.client.delete(*[self.prefix + key for key in keys])
+
+
+def from_config(config, prefix='CACHE_'):
+    """Build the cache selected by <prefix>BACKEND ('simple', 'redis' or 'null').
+
+    The other settings are read under the same prefix: DEFAULT_TTL,
+    MAX_ENTRIES and REDIS_URL.
+    """
+    backend = config.get(f'{prefix}BACKEND', 'simple')
+    ttl = config.get(f'{prefix}DEFAULT_TTL', 60)
+    if backend == 'simple':
+        return LRUCache(max_entries=config.get(f'{prefix}MAX_ENTRIES', 1024),
+                        ttl=ttl)
+    if backend == 'redis':
+        return RedisCache(url=config[f'{prefix}REDIS_URL'], ttl=ttl)
+    if backend == 'null':
+        return NullCache(ttl)
+    raise ValueError(f'unknown {prefix}BACKEND: {backend}')
@@ -0,0 +1,230 @@
+"""gzip and brotli compression of responses, as WSGI middleware.
+
+The encoding comes from the request's Accept-Encoding. The client's
+q-values decide; on a tie, brotli beats gzip. brotli is offered only
+when the brotli package is installed. A response is compressed when:
+
+* its Content-Type is in COMPRESS_MIMETYPES;
+* it is at least COMPRESS_MIN_SIZE bytes, by its Content-Length;
+* it isn't already encoded, a 206 or a HEAD response, and doesn't say
+  `no-transform`.
+
+A streamed response has no Content-Length, so it is compressed whatever
+its size. Its compressor is flushed once a chunk brings the input since
+the last flush to COMPRESS_FLUSH_SIZE bytes. What the view has produced
+then reaches the client without waiting for the rest, and a view that
+yields row by row (the NDJSON exports) doesn't pay for a flush per row.
+
+Compressed responses drop Content-Length and get a weak ETag, and every
+response of a compressible type gets Vary: Accept-Encoding.
+
+With `metrics`, each compressed response records the CPU time spent
+compressing it and its compressed size over its original size. Both are
+histograms by encoding, next to byte counters.
+"""
+import time
+import zlib
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+from metrics import Counter, Histogram
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CPU_BUCKETS = (.0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1)
+RATIO_BUCKETS = (.05, .1, .15, .2, .3, .4, .5, .75, 1)
+
+
+class GzipStream(object):
+    def __init__(self, level):
+        # wbits 31: a zlib stream with a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data, flush):
+        out = self._compressor.compress(data)
+        if flush:
+            out += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliStream(object):
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data, flush):
+        out = self._compressor.process(data)
+        if flush:
+            out += self._compressor.flush()
+        return out
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def weaken_etag(headers):
+    """Mark the ETag weak: the compressed bytes aren't the view's bytes."""
+    etag = headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        headers['ETag'] = 'W/' + etag
+
+
+def init_app(app, metrics=None):
+    """Wrap `app.wsgi_app` in `CompressionMiddleware`, if COMPRESS is on."""
+    config = app.config
+    if not config['COMPRESS']:
+        return
+    encodings = {'gzip': lambda: GzipStream(config['COMPRESS_GZIP_LEVEL'])}
+    if brotli is not None:
+        encodings = {'br': lambda: BrotliStream(
+            config['COMPRESS_BROTLI_QUALITY']), **encodings}
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app, encodings, config['COMPRESS_MIMETYPES'],
+        config['COMPRESS_MIN_SIZE'], config['COMPRESS_FLUSH_SIZE'], metrics)
+
+
+class CompressionMiddleware(object):
+    """Compress the responses of `app` in an encoding the client accepts.
+
+    `encodings` maps each content-coding to a factory for its stream, in
+    order of preference.
+    """
+
+    def __init__(self, app, encodings, mimetypes, min_size=500,
+                 flush_size=4096, metrics=None):
+        self.app = app
+        self.encodings = encodings
+        self.mimetypes = frozenset(mimetypes)
+        self.min_size = min_size
+        self.flush_size = flush_size
+        self.metrics = metrics
+        if metrics is not None:
+            registry = metrics.registry
+            self.cpu_seconds = registry.register(Histogram(
+                'fyyur_compression_cpu_seconds',
+                'CPU time spent compressing a response.', ('encoding',),
+                buckets=CPU_BUCKETS))
+            self.ratios = registry.register(Histogram(
+                'fyyur_compression_ratio',
+                'Compressed size over original size, per response.',
+                ('encoding',), buckets=RATIO_BUCKETS))
+            self.bytes_in = registry.register(Counter(
+                'fyyur_compression_input_bytes_total',
+                'Bytes of responses before compression.', ('encoding',)))
+            self.bytes_out = registry.register(Counter(
+                'fyyur_compression_output_bytes_total',
+                'Bytes of responses after compression.', ('encoding',)))
+
+    def negotiate(self, accept_encoding):
+        """The preferred encoding the client accepts, or None."""
+        accepted = parse_accept_header(accept_encoding)
+        # max() keeps the first of equals: ours is the tie-break
+        best = max(self.encodings, key=lambda encoding: accepted[encoding])
+        return best if accepted[best] else None
+
+    def __call__(self, environ, start_response):
+        started = {}
+
+        # nothing is sent until the encoding is settled, so a second call
+        # (with exc_info, for an error page) can simply replace the first
+        def capture(status, headers, exc_info=None):
+            started.update(status=status, headers=Headers(headers))
+            return pending.append
+
+        pending = []
+        body = self.app(environ, capture)
+        chunks = iter(body)
+        if not started:
+            # an app that starts the response on its first chunk
+            pending.extend(chunk for chunk in [next(chunks, b'')] if chunk)
+        status, headers = started['status'], started['headers']
+
+        encoding = self._encoding_for(environ, status, headers)
+        if encoding is None:
+            start_response(status, headers.to_wsgi_list())
+            if not pending:
+                return body
+            return self._passthrough(pending, chunks, body)
+
+        streamed = 'Content-Length' not in headers
+        headers.remove('Content-Length')
+        headers['Content-Encoding'] = encoding
+        weaken_etag(headers)
+        start_response(status, headers.to_wsgi_list())
+        return self._compress(encoding, pending, chunks, body, streamed)
+
+    def _encoding_for(self, environ, status, headers):
+        """Set Vary on a compressible response; pick its encoding, if any."""
+        encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if status[:3] == '304':
+            # a 304 has no Content-Type to go by; it confirms a copy that
+            # was tagged weak if it was compressed
+            if encoding is not None:
+                weaken_etag(headers)
+            return None
+        content_type = headers.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in self.mimetypes:
+            return None
+        vary = headers.get('Vary', '')
+        if 'accept-encoding' not in vary.lower() and vary != '*':
+            headers['Vary'] = f'{vary}, Accept-Encoding' if vary \
+                else 'Accept-Encoding'
+        if encoding is None:
+            return None
+        length = headers.get('Content-Length', type=int)
+        if (environ['REQUEST_METHOD'] == 'HEAD'
+                or status[:3] in ('204', '206')
+                or 'Content-Encoding' in headers
+                or 'no-transform' in headers.get('Cache-Control', '')
+                or (length is not None and length < self.min_size)):
+            return None
+        return encoding
+
+    @staticmethod
+    def _passthrough(pending, chunks, body):
+        try:
+            yield from pending
+            yield from chunks
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+    def _compress(self, encoding, pending, chunks, body, streamed):
+        stream = self.encodings[encoding]()
+        size_in = size_out = unflushed = 0
+        cpu = 0.0
+        try:
+            for source in (pending, chunks):
+                for chunk in source:
+                    if not chunk:
+                        continue
+                    unflushed += len(chunk)
+                    flush = streamed and unflushed >= self.flush_size
+                    if flush:
+                        unflushed = 0
+                    started = time.thread_time()
+                    data = stream.compress(chunk, flush)
+                    cpu += time.thread_time() - started
+                    size_in += len(chunk)
+                    size_out += len(data)
+                    if data:
+                        yield data
+            started = time.thread_time()
+            data = stream.finish()
+            cpu += time.thread_time() - started
+            size_out += len(data)
+            yield data
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+            if self.metrics is not None and size_in:
+                self.cpu_seconds.observe(encoding, value=cpu)
+                self.ratios.observe(encoding, value=size_out / size_in)
+                self.bytes_in.inc(encoding, amount=size_in)
+                self.bytes_out.inc(encoding, amount=size_out)
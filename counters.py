@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, or_
+
+from extensions import db
+from models import Artist, Show, ShowCounterWatermark, Venue
+
+
+def counter_watermark(for_update=False):
+    """The watermark row, locked for the rest of the transaction.
+
+    Show writers take it FOR SHARE and the rollover FOR UPDATE, so a
+    rollover waits for shows being written against the old watermark to
+    commit, and then sees them.
+    """
+    watermark = db.session.query(ShowCounterWatermark).filter_by(
+        id=1).with_for_update(read=not for_update).first()
+    if watermark is None:
+        watermark = ShowCounterWatermark(id=1, rolled_over_at=datetime.now())
+        db.session.add(watermark)
+        db.session.flush()
+    return watermark
+
+
+def count_shows(shows, sign=1):
+    """Add `(venue_id, artist_id, start_time)` shows to the counters.
+
+    `sign=-1` takes them off again. Runs in the caller's transaction, with
+    one UPDATE per table and counter whatever the number of shows.
+    """
+    rolled_over_at = counter_watermark().rolled_over_at
+    deltas = {}
+    for venue_id, artist_id, start_time in shows:
+        column = ('upcoming_shows_count' if start_time > rolled_over_at
+                  else 'past_shows_count')
+        for model, entity_id in ((Venue, venue_id), (Artist, artist_id)):
+            by_id = deltas.setdefault((model, column), {})
+            by_id[int(entity_id)] = by_id.get(int(entity_id), 0) + sign
+    for (model, column), by_id in deltas.items():
+        counter = getattr(model, column)
+        db.session.query(model).filter(model.id.in_(by_id)).update(
+            {counter: counter + case(by_id, value=model.id, else_=0)},
+            synchronize_session=False)
+
+
+def roll_over_counters(now=None):
+    """Move shows that started since the last rollover from upcoming to past.
+
+    Returns the number of shows moved. Cheap enough to run every few
+    minutes: only shows starting inside the window are counted.
+    """
+    now = now or datetime.now()
+    watermark = counter_watermark(for_update=True)
+    moved = 0
+    if now > watermark.rolled_over_at:
+        for model, column in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+            started = dict(db.session.query(column, func.count(Show.id)).filter(
+                Show.start_time > watermark.rolled_over_at,
+                Show.start_time <= now).group_by(column).all())
+            if not started:
+                continue
+            moved = sum(started.values())
+            delta = case(started, value=model.id, else_=0)
+            db.session.query(model).filter(model.id.in_(started)).update(
+                {model.upcoming_shows_count: model.upcoming_shows_count - delta,
+                 model.past_shows_count: model.past_shows_count + delta},
+                synchronize_session=False)
+        watermark.rolled_over_at = now
+    db.session.commit()
+    return moved
+
+
+def counter_mismatches(model, column):
+    """`(id, stored, actual)` for each `model` whose counters are wrong.
+
+    `stored` and `actual` are `(upcoming, past)` pairs, counted at the
+    current watermark.
+    """
+    rolled_over_at = counter_watermark(for_update=True).rolled_over_at
+    upcoming = func.count(case((Show.start_time > rolled_over_at, Show.id)))
+    past = func.count(case((Show.start_time <= rolled_over_at, Show.id)))
+    rows = db.session.query(
+        model.id, model.upcoming_shows_count, model.past_shows_count,
+        upcoming, past).outerjoin(Show, column == model.id).group_by(
+        model.id).having(or_(model.upcoming_shows_count != upcoming,
+                             model.past_shows_count != past))
+    return [(r[0], (r[1], r[2]), (r[3], r[4])) for r in rows]
+
+
+def count_show_batch(mappings):
+    count_shows((m['venue_id'], m['artist_id'], m['start_time'])
+                for m in mappings)
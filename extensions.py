@@ -0,0 +1,21 @@
+"""Extension instances, bound to an application by `app.create_app`.
+
+Importing this module creates no application and opens no connection, so
+models, queries and blueprints can import from it freely.
+"""
+from flask import current_app
+from flask_moment import Moment
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.local import LocalProxy
+
+db = SQLAlchemy()
+moment = Moment()
+
+# the application's detail page cache (see cache.from_config)
+detail_cache = LocalProxy(lambda: current_app.extensions['detail_cache'])
+
+
+def init_migrate(app):
+    """Set up Flask-Migrate; it imports Alembic, so only `flask db` should."""
+    from flask_migrate import Migrate
+    Migrate(app, db)
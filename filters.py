@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+DATETIME_FORMATS = {'full': "EEEE MMMM, d, y 'at' h:mma",
+                    'medium': "EE MM, dd, y h:mma"}
+
+
+@lru_cache(maxsize=64)
+def datetime_pattern(format, locale):
+    """Parsed Babel pattern and locale, built once per (format, locale)."""
+    # Babel loads its locale data on import; defer it to the first render
+    import babel
+    import babel.dates
+    return (babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format)),
+            babel.Locale.parse(locale))
+
+
+def format_datetime(value, format='medium', locale='en'):
+    # views pass datetimes straight through; strings are still accepted
+    if isinstance(value, str):
+        import dateutil.parser
+        value = dateutil.parser.parse(value)
+    pattern, locale = datetime_pattern(format, locale)
+    return pattern.apply(value, locale)
+
+
+def init_app(app):
+    app.jinja_env.filters['datetime'] = format_datetime
@@ -1,9 +1,11 @@
 from datetime import datetime
 from random import choices
 from flask_wtf import Form, FlaskForm
-from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
-from wtforms.validators import DataRequired, AnyOf, URL
+from flask_wtf.file import FileField, FileRequired
+from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField, IntegerField
+from wtforms.validators import DataRequired, InputRequired, AnyOf, URL
 
+import importer
 from validators import ChoiceEnum, FacebookEnum, PhoneValidator
 
 
@@ -21,6 +23,20 @@ class ShowForm(FlaskForm):
     )
 
 
+class ShowImportForm(ShowForm):
+    # the ids go straight into a bulk insert, so they must be whole numbers
+    artist_id = IntegerField(
+        'artist_id', validators=[InputRequired()]
+    )
+    venue_id = IntegerField(
+        'venue_id', validators=[InputRequired()]
+    )
+    # ShowForm's default is the time the module was imported
+    start_time = DateTimeField(
+        'start_time', validators=[InputRequired()]
+    )
+
+
 class VenueForm(FlaskForm):
     name = StringField(
         'name', validators=[DataRequired()]
@@ -239,3 +255,18 @@ class ArtistForm(FlaskForm):
     seeking_description = StringField(
         'seeking_description'
     )
+
+
+class ImportForm(FlaskForm):
+    # the choices are the importable kinds, set by the view
+    kind = SelectField(
+        'kind', validators=[DataRequired()]
+    )
+    format = SelectField(
+        'format',
+        choices=[('', 'from the file name')] +
+        [(format, format) for format in importer.FORMATS]
+    )
+    file = FileField(
+        'file', validators=[FileRequired('choose a file to import')]
+    )
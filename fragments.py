@@ -0,0 +1,50 @@
+import hashlib
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+def fragment_key(key):
+    """Cache key for a `{% cache %}` key: a value or a list of values.
+
+    Keys are meant to contain an id and an `updated_at`, so a change to the
+    row yields a new key and the stale fragment simply ages out.
+    """
+    if isinstance(key, (list, tuple)):
+        key = '|'.join(map(str, key))
+    key = str(key)
+    if len(key) > 200:
+        key = hashlib.md5(key.encode()).hexdigest()
+    return f'fragment:{key}'
+
+
+class FragmentCacheExtension(Extension):
+    """`{% cache key[, ttl] %}...{% endcache %}` stores rendered HTML.
+
+    The fragments go to `environment.fragment_cache`, any `cache.BaseCache`
+    backend; with none set the body is rendered every time. `ttl` defaults
+    to the backend's.
+    """
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', args), [], [],
+                               body).set_lineno(lineno)
+
+    def _render(self, key, ttl, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        return Markup(cache.get_or_set(fragment_key(key), caller, ttl))
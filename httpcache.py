@@ -0,0 +1,78 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+
+
+def etag_for(*parts):
+    return hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def is_fresh(etag, last_modified):
+    """Whether the client's copy, per the conditional headers, is current."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return request.if_modified_since >= last_modified
+    return False
+
+
+def conditional(version):
+    """Answer a GET view with 304 Not Modified when the client is current.
+
+    `version(**view_args)` runs before the view and returns
+    `(last_modified, token)` from a cheap query, or None when there is
+    nothing to validate (the view then runs as usual, e.g. to 404). The
+    ETag covers the token and the full path with its query string, so
+    each page of a listing has its own. Nothing is rendered for a 304.
+
+    A session with pending flashed messages always gets the full page,
+    since the messages are rendered into it.
+
+    The view can read the token back with `current_version()`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            stamp = None
+            if request.method in ('GET', 'HEAD') and '_flashes' not in session:
+                stamp = version(**view_args)
+            if stamp is None:
+                return view(**view_args)
+            last_modified, token = stamp
+            g.http_version = token
+            if last_modified is not None:
+                last_modified = last_modified.replace(
+                    microsecond=0, tzinfo=timezone.utc)
+            etag = etag_for(request.full_path, token)
+            if is_fresh(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(**view_args))
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
+
+
+def current_version():
+    """The token `conditional` read for this request, or None."""
+    return g.get('http_version')
+
+
+def init_app(app):
+    """Apply HTTP_CACHE_CONTROL to successful GET responses, by endpoint."""
+    @app.after_request
+    def cache_control(response):
+        policy = app.config['HTTP_CACHE_CONTROL'].get(request.endpoint)
+        if (policy and request.method in ('GET', 'HEAD')
+                and response.status_code in (200, 304)
+                and 'Cache-Control' not in response.headers):
+            # flashed messages were rendered into this copy: keep it private
+            if session.modified:
+                policy = 'private, no-cache'
+            response.headers['Cache-Control'] = policy
+        return response
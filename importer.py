@@ -0,0 +1,136 @@
+import csv
+import json
+
+from werkzeug.datastructures import MultiDict
+from wtforms import SelectMultipleField
+
+FORMATS = ('csv', 'ndjson')
+
+# separates the values of a multi-valued field (genres) inside a CSV cell
+CSV_LIST_SEPARATOR = ';'
+
+
+class ImportReport(object):
+    def __init__(self):
+        self.inserted = 0
+        self.rejected = []
+
+    def reject(self, line, errors):
+        self.rejected.append((line, errors))
+
+    def __repr__(self):
+        return f'{self.inserted} inserted, {len(self.rejected)} rejected'
+
+
+def guess_format(filename):
+    if filename.endswith('.csv'):
+        return 'csv'
+    if filename.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    raise ValueError(f'cannot tell the format of {filename}')
+
+
+def list_fields(form_class):
+    """The names of the multi-valued fields of `form_class`."""
+    return frozenset(
+        name for name in dir(form_class)
+        if issubclass(getattr(getattr(form_class, name), 'field_class', type),
+                      SelectMultipleField))
+
+
+def read_rows(stream, format, list_fields=()):
+    """Yield `(line, row, error)` from a CSV or NDJSON text stream.
+
+    Rows are read one at a time so files of any size can be imported.
+    `line` is the line the row starts on; `error` is set and `row` is None
+    when the line cannot be parsed. CSV cells of the `list_fields` columns
+    are split on CSV_LIST_SEPARATOR; every other cell is kept whole.
+    """
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        reader.fieldnames  # reads the header, so line_num counts it
+        line = reader.line_num + 1
+        for row in reader:
+            yield line, {k: (v.split(CSV_LIST_SEPARATOR)
+                             if k in list_fields and v else v)
+                         for k, v in row.items() if k}, None
+            line = reader.line_num + 1
+    elif format == 'ndjson':
+        for line, text in enumerate(stream, 1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                yield line, None, {'line': [f'invalid JSON: {e}']}
+                continue
+            if not isinstance(row, dict):
+                yield line, None, {'line': ['expected a JSON object']}
+                continue
+            yield line, row, None
+    else:
+        raise ValueError(f'unknown import format: {format}')
+
+
+def validate_row(form_class, row):
+    """Run a row through `form_class`; return `(form, errors)`."""
+    pairs = []
+    for name, value in row.items():
+        for item in (value if isinstance(value, list) else [value]):
+            pairs.append((name, '' if item is None else item))
+    form = form_class(formdata=MultiDict(pairs), meta={'csrf': False})
+    if form.validate():
+        return form, None
+    return form, form.errors
+
+
+def run_import(session, model, form_class, rows, to_mapping,
+               batch_size=1000, check_batch=None, on_insert=None,
+               on_batch=None, insert=None):
+    """Validate `rows` with `form_class` and insert them in batches.
+
+    `to_mapping(form)` turns a valid form into the column mapping handed to
+    `bulk_insert_mappings`. `check_batch(batch)` may return `{line: errors}`
+    for rows that need a database lookup to reject (unknown foreign keys,
+    for instance). `on_insert(mappings)` runs inside each batch's
+    transaction, right before the commit, and `on_batch(mappings)` after it.
+    `insert(model, mappings)` replaces the plain `bulk_insert_mappings`,
+    e.g. to give the mappings their new primary keys.
+    """
+    report = ImportReport()
+    batch = []
+
+    def flush():
+        if check_batch:
+            bad = check_batch(batch)
+            for line, errors in sorted(bad.items()):
+                report.reject(line, errors)
+            mappings = [m for line, m in batch if line not in bad]
+        else:
+            mappings = [m for line, m in batch]
+        if mappings:
+            if insert:
+                insert(model, mappings)
+            else:
+                session.bulk_insert_mappings(model, mappings)
+            if on_insert:
+                on_insert(mappings)
+            session.commit()
+            report.inserted += len(mappings)
+            if on_batch:
+                on_batch(mappings)
+        del batch[:]
+
+    for line, row, error in rows:
+        if error is None:
+            form, error = validate_row(form_class, row)
+        if error:
+            report.reject(line, error)
+            continue
+        batch.append((line, to_mapping(form)))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    report.rejected.sort(key=lambda rejected: rejected[0])
+    return report
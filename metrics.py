@@ -0,0 +1,288 @@
+import bisect
+import threading
+import time
+
+from flask import (Response, before_render_template, g, has_request_context,
+                   request, template_rendered)
+from sqlalchemy import event
+
+from extensions import db
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ('%s="%s"' % (name, str(value).replace('\\', r'\\')
+                          .replace('"', r'\"').replace('\n', r'\n'))
+             for name, value in zip(names, values))
+    return '{%s}' % ','.join(pairs)
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(object):
+    """A family of samples sharing a name, keyed by label values."""
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help}',
+                 f'# TYPE {self.name} {self.type}']
+        for values, value in self.samples():
+            lines.append(f'{self.name}{_labels(self.label_names, values)} '
+                         f'{_number(value)}')
+        return lines
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        with self._lock:
+            counts, total = self._values.get(
+                labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[labels] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            return sorted((labels, (list(counts), total))
+                          for labels, (counts, total) in self._values.items())
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help}',
+                 f'# TYPE {self.name} {self.type}']
+        names = self.label_names + ('le',)
+        for values, (counts, total) in self.samples():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket'
+                             f'{_labels(names, values + (_number(bound),))} '
+                             f'{cumulative}')
+            labels = _labels(self.label_names, values)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry(object):
+    """Metrics of this process plus collectors read at scrape time.
+
+    A collector is a callable returning `(name, type, help, samples)`
+    tuples, where `samples` is a list of `(labels dict, value)` pairs.
+    It is how values owned elsewhere (cache counters, the connection pool)
+    are exposed without copying them on every change.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        for collector in self.collectors:
+            for name, type, help, samples in collector():
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(labels, labels.values())} '
+                                 f'{_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class Metrics(object):
+    """Request, database and template metrics for a Flask app.
+
+    Served in the Prometheus text format at METRICS_PATH. Requests are
+    timed from `before_request` to `after_request`, SQL statements are
+    timed from the SQLAlchemy cursor events and attributed to the endpoint
+    that issued them, and templates are timed from Flask's render signals.
+    """
+
+    def __init__(self, app=None):
+        self.registry = Registry()
+        self.requests = self.registry.register(Histogram(
+            'fyyur_request_duration_seconds',
+            'Time spent handling a request.', ('endpoint', 'method')))
+        self.responses = self.registry.register(Counter(
+            'fyyur_responses_total', 'Responses sent, by status code.',
+            ('endpoint', 'method', 'status')))
+        self.in_flight = self.registry.register(Gauge(
+            'fyyur_requests_in_flight', 'Requests being handled.',
+            ('endpoint',)))
+        self.db_queries = self.registry.register(Counter(
+            'fyyur_db_queries_total', 'SQL statements executed.',
+            ('endpoint',)))
+        self.db_seconds = self.registry.register(Counter(
+            'fyyur_db_query_seconds_total',
+            'Time spent executing SQL statements.', ('endpoint',)))
+        self.templates = self.registry.register(Histogram(
+            'fyyur_template_render_seconds', 'Time spent rendering a template.',
+            ('template',)))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        # on the app's own engine, so other apps' statements never get here
+        engine = db.get_engine(app)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.add_url_rule(app.config['METRICS_PATH'], 'metrics', self.view)
+
+    def add_collector(self, collector):
+        self.registry.collectors.append(collector)
+
+    def view(self):
+        return Response(self.registry.expose(), content_type=CONTENT_TYPE)
+
+    @staticmethod
+    def _endpoint():
+        return request.endpoint or 'unmatched'
+
+    def _start(self):
+        g.metrics_started = time.perf_counter()
+        self.in_flight.inc(self._endpoint())
+
+    def _finish(self, response):
+        started = g.get('metrics_started')
+        if started is not None:
+            endpoint = self._endpoint()
+            self.requests.observe(endpoint, request.method,
+                                  value=time.perf_counter() - started)
+            self.responses.inc(endpoint, request.method,
+                               str(response.status_code))
+        return response
+
+    def _teardown(self, error):
+        if g.pop('metrics_started', None) is not None:
+            self.in_flight.dec(self._endpoint())
+
+    def _before_cursor(self, conn, cursor, statement, parameters, context,
+                       executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor(self, conn, cursor, statement, parameters, context,
+                      executemany):
+        if not conn.info.get('metrics_started'):
+            return
+        elapsed = time.perf_counter() - conn.info['metrics_started'].pop()
+        endpoint = self._endpoint() if has_request_context() else 'none'
+        self.db_queries.inc(endpoint)
+        self.db_seconds.inc(endpoint, amount=elapsed)
+
+    def _before_render(self, app, template, context):
+        g.setdefault('metrics_templates', []).append(time.perf_counter())
+
+    def _after_render(self, app, template, context):
+        if g.get('metrics_templates'):
+            self.templates.observe(
+                template.name or 'string',
+                value=time.perf_counter() - g.metrics_templates.pop())
+
+
+def cache_collector(caches):
+    """Collector for the `stats()` of the named `cache.BaseCache` instances."""
+    def collect():
+        stats = {name: cache.stats() for name, cache in caches.items()}
+        for key, type, help in (
+                ('hits', 'counter', 'Cache lookups answered from the cache.'),
+                ('misses', 'counter', 'Cache lookups that had to load.'),
+                ('evictions', 'counter', 'Entries evicted to make room.'),
+                ('hit_ratio', 'gauge', 'Hits over lookups since start.')):
+            name = f'fyyur_cache_{key}' + ('_total' if type == 'counter' else '')
+            yield name, type, help, [({'cache': cache}, data[key])
+                                     for cache, data in stats.items()]
+    return collect
+
+
+def lru_collector(functions):
+    """Collector for the `cache_info()` of `functools.lru_cache` functions."""
+    def collect():
+        samples = []
+        for name, function in functions.items():
+            info = function.cache_info()
+            lookups = info.hits + info.misses
+            samples.append(({'cache': name},
+                            info.hits / lookups if lookups else 0.0))
+        yield 'fyyur_memo_hit_ratio', 'gauge', \
+            'Hits over lookups of memoized functions.', samples
+    return collect
+
+
+def pool_collector(stats):
+    """Collector for a `dbpool.PoolStats`."""
+    def collect():
+        snapshot = stats.snapshot()
+        yield ('fyyur_db_pool_checkouts_total', 'counter',
+               'Connections checked out of the pool.',
+               [({}, snapshot['checkouts'])])
+        yield ('fyyur_db_pool_timeouts_total', 'counter',
+               'Checkouts that gave up waiting for a connection.',
+               [({}, snapshot['timeouts'])])
+        yield ('fyyur_db_pool_wait_seconds_total', 'counter',
+               'Time spent waiting for a pooled connection.',
+               [({}, snapshot['wait_seconds_total'])])
+        for key in ('size', 'checked_out', 'overflow', 'idle'):
+            if key in snapshot:
+                yield (f'fyyur_db_pool_{key}', 'gauge',
+                       f'Pool connections: {key.replace("_", " ")}.',
+                       [({}, snapshot[key])])
+    return collect
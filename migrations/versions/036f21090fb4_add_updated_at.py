@@ -0,0 +1,47 @@
+"""add updated_at
+
+Revision ID: 036f21090fb4
+Revises: 789138971335
+Create Date: 2026-10-18 12:41:05.552810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import search
+
+
+# revision identifiers, used by Alembic.
+revision = '036f21090fb4'
+down_revision = '789138971335'
+branch_labels = None
+depends_on = None
+
+TABLES = ('Venue', 'Artist', 'shows')
+
+
+def upgrade():
+    # UTC, like the datetime.utcnow() the app writes; on SQLite, now() is
+    # CURRENT_TIMESTAMP, which is UTC already
+    dialect = op.get_bind().dialect.name
+    postgresql = dialect == 'postgresql'
+    now = sa.text("timezone('utc', now())") if postgresql else sa.func.now()
+    for table in TABLES:
+        # SQLite only adds a column with a non-constant default to an empty
+        # table, so there the table is copied instead
+        with op.batch_alter_table(
+                table, recreate='auto' if postgresql else 'always') as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(),
+                                          server_default=now, nullable=False))
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'],
+                        unique=False)
+    if dialect == 'sqlite':
+        # the copies dropped the search index's triggers on Venue and Artist
+        for statement in search.sqlite_index_ddl():
+            op.execute(statement)
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        op.drop_column(table, 'updated_at')
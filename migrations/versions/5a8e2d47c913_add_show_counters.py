@@ -0,0 +1,53 @@
+"""add upcoming and past show counters
+
+Revision ID: 5a8e2d47c913
+Revises: 036f21090fb4
+Create Date: 2026-10-18 13:20:44.108342
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8e2d47c913'
+down_revision = '036f21090fb4'
+branch_labels = None
+depends_on = None
+
+TABLES = {'Venue': 'venue_id', 'Artist': 'artist_id'}
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(),
+                                       server_default='0', nullable=False))
+        op.add_column(table, sa.Column('past_shows_count', sa.Integer(),
+                                       server_default='0', nullable=False))
+    watermark = op.create_table(
+        'show_counter_watermark',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rolled_over_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'))
+    now = datetime.now()
+    op.bulk_insert(watermark, [{'id': 1, 'rolled_over_at': now}])
+    for table, column in TABLES.items():
+        op.execute(sa.text(f'''
+            UPDATE "{table}" SET
+                upcoming_shows_count = (
+                    SELECT count(*) FROM shows
+                    WHERE shows.{column} = "{table}".id
+                      AND shows.start_time > :now),
+                past_shows_count = (
+                    SELECT count(*) FROM shows
+                    WHERE shows.{column} = "{table}".id
+                      AND shows.start_time <= :now)''').bindparams(now=now))
+
+
+def downgrade():
+    op.drop_table('show_counter_watermark')
+    for table in TABLES:
+        op.drop_column(table, 'past_shows_count')
+        op.drop_column(table, 'upcoming_shows_count')
@@ -0,0 +1,38 @@
+"""add listing keyset indexes
+
+Revision ID: 789138971335
+Revises: eb1effc30ff8
+Create Date: 2026-10-18 11:20:53.117642
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '789138971335'
+down_revision = 'eb1effc30ff8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the keyset indexes cover the leading columns of the ones they replace
+    op.create_index('ix_shows_start_time_id', 'shows',
+                    ['start_time', 'id'], unique=False)
+    op.drop_index('ix_shows_start_time', table_name='shows')
+    op.create_index('ix_Venue_state_city_name', 'Venue',
+                    ['state', 'city', 'name', 'id'], unique=False)
+    op.drop_index('ix_Venue_state_city', table_name='Venue')
+    op.create_index('ix_Artist_name_id', 'Artist',
+                    ['name', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_Artist_name_id', table_name='Artist')
+    op.create_index('ix_Venue_state_city', 'Venue',
+                    ['state', 'city'], unique=False)
+    op.drop_index('ix_Venue_state_city_name', table_name='Venue')
+    op.create_index('ix_shows_start_time', 'shows',
+                    ['start_time'], unique=False)
+    op.drop_index('ix_shows_start_time_id', table_name='shows')
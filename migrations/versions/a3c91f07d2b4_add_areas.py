@@ -0,0 +1,64 @@
+"""add areas
+
+Revision ID: a3c91f07d2b4
+Revises: 5a8e2d47c913
+Create Date: 2026-10-18 14:02:37.581904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import search
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c91f07d2b4'
+down_revision = '5a8e2d47c913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'Area',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('state', sa.String(length=120), nullable=False),
+        sa.Column('city', sa.String(length=120), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('state', 'city', name='uq_Area_state_city'))
+    op.add_column('Venue', sa.Column('area_id', sa.Integer(), nullable=True))
+    # venues missing a city or state end up in an area with a blank one
+    op.execute('''
+        INSERT INTO "Area" (state, city)
+        SELECT DISTINCT coalesce(state, ''), coalesce(city, '') FROM "Venue"''')
+    op.execute('''
+        UPDATE "Venue" SET area_id = "Area".id FROM "Area"
+        WHERE "Area".state = coalesce("Venue".state, '')
+          AND "Area".city = coalesce("Venue".city, '')''')
+    # SQLite can't alter a column or add a constraint in place: batch mode
+    # copies the table there, and issues plain ALTERs elsewhere
+    with op.batch_alter_table('Venue') as batch_op:
+        batch_op.alter_column('area_id', existing_type=sa.Integer(),
+                              nullable=False)
+        batch_op.create_foreign_key('fk_Venue_area_id_Area', 'Area',
+                                    ['area_id'], ['id'])
+    op.create_index('ix_Venue_area_id_name', 'Venue',
+                    ['area_id', 'name', 'id'], unique=False)
+    restore_search_triggers()
+
+
+def downgrade():
+    op.drop_index('ix_Venue_area_id_name', table_name='Venue')
+    # dropping the column drops its foreign key too; SQLite doesn't reflect
+    # the key's name, so it can't be dropped by name there
+    with op.batch_alter_table('Venue') as batch_op:
+        batch_op.drop_column('area_id')
+    op.drop_table('Area')
+    restore_search_triggers()
+
+
+def restore_search_triggers():
+    # copying Venue on SQLite dropped the search index's triggers on it
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in search.sqlite_index_ddl():
+            op.execute(statement)
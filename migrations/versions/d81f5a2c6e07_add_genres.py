@@ -0,0 +1,108 @@
+"""add genres
+
+Revision ID: d81f5a2c6e07
+Revises: a3c91f07d2b4
+Create Date: 2026-10-18 14:48:12.306417
+
+"""
+import ast
+import csv
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f5a2c6e07'
+down_revision = 'a3c91f07d2b4'
+branch_labels = None
+depends_on = None
+
+
+def parse_genres(value):
+    """Genre names from an old `Artist.genres` string.
+
+    The forms stored a PostgreSQL array literal ('{Jazz,"Rock n Roll"}'),
+    or on other databases the repr of a list; anything else is read as a
+    comma-separated list.
+    """
+    value = (value or '').strip()
+    if value.startswith('{') and value.endswith('}'):
+        names = next(csv.reader([value[1:-1]], escapechar='\\',
+                                doublequote=False), [])
+    elif value.startswith('['):
+        try:
+            names = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            names = [n.strip().strip('\'"')
+                     for n in value.strip('[]').split(',')]
+    else:
+        names = value.split(',')
+    names = (str(name).strip() for name in names)
+    return list(dict.fromkeys(n for n in names if n and n != 'NULL'))
+
+
+def genres_literal(names):
+    return '{' + ','.join(f'"{n}"' if set(n) & set(' ,"{}') else n
+                          for n in names) + '}'
+
+
+def upgrade():
+    genre = op.create_table(
+        'Genre',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=120), nullable=False),
+        sa.Column('artist_count', sa.Integer(), server_default='0',
+                  nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'))
+    links = {}
+    for table, key, parent in (('artist_genres', 'artist_id', 'Artist'),
+                               ('venue_genres', 'venue_id', 'Venue')):
+        links[table] = op.create_table(
+            table,
+            sa.Column(key, sa.Integer(), nullable=False),
+            sa.Column('genre_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint([key], [f'{parent}.id'],
+                                    ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['genre_id'], ['Genre.id']),
+            sa.PrimaryKeyConstraint(key, 'genre_id'))
+        op.create_index(f'ix_{table}_genre_id', table, ['genre_id', key],
+                        unique=False)
+
+    connection = op.get_bind()
+    artists = [(artist_id, parse_genres(genres)) for artist_id, genres in
+               connection.execute(sa.text('SELECT id, genres FROM "Artist"'))]
+    names = sorted({name for _, genres in artists for name in genres})
+    if names:
+        op.bulk_insert(genre, [{'name': name} for name in names])
+        ids = dict(connection.execute(
+            sa.text('SELECT name, id FROM "Genre"')).all())
+        op.bulk_insert(links['artist_genres'], [
+            {'artist_id': artist_id, 'genre_id': ids[name]}
+            for artist_id, genres in artists for name in genres])
+        op.execute('''
+            UPDATE "Genre" SET artist_count = (
+                SELECT count(*) FROM artist_genres
+                WHERE artist_genres.genre_id = "Genre".id)''')
+    op.drop_column('Artist', 'genres')
+
+
+def downgrade():
+    op.add_column('Artist', sa.Column('genres', sa.String(length=120),
+                                      nullable=True))
+    connection = op.get_bind()
+    genres = {}
+    for artist_id, name in connection.execute(sa.text('''
+            SELECT artist_id, name FROM artist_genres
+            JOIN "Genre" ON "Genre".id = artist_genres.genre_id
+            ORDER BY artist_id, name''')):
+        genres.setdefault(artist_id, []).append(name)
+    for artist_id, names in genres.items():
+        connection.execute(
+            sa.text('UPDATE "Artist" SET genres = :genres WHERE id = :id'),
+            {'genres': genres_literal(names), 'id': artist_id})
+    for table in ('venue_genres', 'artist_genres'):
+        op.drop_index(f'ix_{table}_genre_id', table_name=table)
+        op.drop_table(table)
+    op.drop_table('Genre')
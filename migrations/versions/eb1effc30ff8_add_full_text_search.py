@@ -0,0 +1,82 @@
+"""add full text search
+
+Revision ID: eb1effc30ff8
+Revises: f73a608d00cd
+Create Date: 2026-10-18 10:02:11.904316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+import search
+
+# revision identifiers, used by Alembic.
+revision = 'eb1effc30ff8'
+down_revision = 'f73a608d00cd'
+branch_labels = None
+depends_on = None
+
+TABLES = ('Venue', 'Artist')
+
+VECTOR = '''
+    setweight(to_tsvector('simple', coalesce({0}.name, '')), 'A') ||
+    setweight(to_tsvector('simple',
+        coalesce({0}.city, '') || ' ' || coalesce({0}.state, '')), 'B')'''
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect != 'postgresql':
+        # the schema create_all() builds: the column stays empty, and SQLite
+        # searches its FTS5 index instead
+        for table in TABLES:
+            op.add_column(table, sa.Column('search_vector', sa.Text(),
+                                           nullable=True))
+            op.create_index(f'ix_{table}_search_vector', table,
+                            ['search_vector'], unique=False)
+        if dialect == 'sqlite':
+            for statement in search.sqlite_index_ddl():
+                op.execute(statement)
+        return
+
+    for table in TABLES:
+        name = table.lower()
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(),
+                                       nullable=True))
+        op.execute(f'''
+            CREATE FUNCTION {name}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {VECTOR.format('NEW')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql''')
+        op.execute(f'''
+            CREATE TRIGGER {name}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF name, city, state ON "{table}"
+            FOR EACH ROW EXECUTE PROCEDURE {name}_search_vector_update()''')
+        quoted = f'"{table}"'
+        op.execute(f'UPDATE {quoted} SET search_vector = {VECTOR.format(quoted)}')
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'],
+                        unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect != 'postgresql':
+        if dialect == 'sqlite':
+            for kind in search.TABLES:
+                for event in ('insert', 'update', 'delete'):
+                    op.execute(f'DROP TRIGGER IF EXISTS {kind}_search_{event}')
+            op.execute('DROP TABLE IF EXISTS search_index')
+        for table in TABLES:
+            op.drop_index(f'ix_{table}_search_vector', table_name=table)
+            op.drop_column(table, 'search_vector')
+        return
+
+    for table in TABLES:
+        name = table.lower()
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.execute(f'DROP TRIGGER {name}_search_vector_trigger ON "{table}"')
+        op.execute(f'DROP FUNCTION {name}_search_vector_update()')
+        op.drop_column(table, 'search_vector')
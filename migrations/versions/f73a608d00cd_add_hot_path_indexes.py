@@ -0,0 +1,46 @@
+"""add hot path indexes
+
+Revision ID: f73a608d00cd
+Revises: c0107e238225
+Create Date: 2026-10-18 09:12:40.381027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f73a608d00cd'
+down_revision = 'c0107e238225'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # trigram indexes back the ilike('%term%') name searches
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.create_index('ix_shows_venue_id_start_time', 'shows',
+                    ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_shows_artist_id_start_time', 'shows',
+                    ['artist_id', 'start_time'], unique=False)
+    op.create_index('ix_shows_start_time', 'shows',
+                    ['start_time'], unique=False)
+    op.create_index('ix_Venue_state_city', 'Venue',
+                    ['state', 'city'], unique=False)
+    op.create_index('ix_Venue_name_trgm', 'Venue', ['name'], unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_Artist_name_trgm', 'Artist', ['name'], unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_Artist_name_trgm', table_name='Artist')
+    op.drop_index('ix_Venue_name_trgm', table_name='Venue')
+    op.drop_index('ix_Venue_state_city', table_name='Venue')
+    op.drop_index('ix_shows_start_time', table_name='shows')
+    op.drop_index('ix_shows_artist_id_start_time', table_name='shows')
+    op.drop_index('ix_shows_venue_id_start_time', table_name='shows')
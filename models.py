@@ -0,0 +1,195 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+import search
+from extensions import db
+
+
+class utcnow(FunctionElement):
+    """The current UTC time, as the naive datetime `datetime.utcnow` gives."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is in UTC already
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    # now() is in the session's time zone
+    return "timezone('utc', now())"
+
+
+class Area(db.Model):
+    __tablename__ = 'Area'
+
+    id = db.Column(db.Integer, primary_key=True)
+    state = db.Column(db.String(120), nullable=False)
+    city = db.Column(db.String(120), nullable=False)
+    venues = db.relationship('Venue', backref='area', lazy=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('state', 'city', name='uq_Area_state_city'),
+    )
+
+    def __repr__(self):
+        return f'{self.city}, {self.state}'
+
+
+class Genre(db.Model):
+    __tablename__ = 'Genre'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False, unique=True)
+    # the /artists facet; kept exact by refresh_genre_counts()
+    artist_count = db.Column(db.Integer, nullable=False, default=0,
+                             server_default='0')
+
+    def __repr__(self):
+        return self.name
+
+
+artist_genres = db.Table(
+    'artist_genres',
+    db.Column('artist_id', db.Integer,
+              db.ForeignKey('Artist.id', ondelete='CASCADE'),
+              primary_key=True),
+    db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id'),
+              primary_key=True),
+    db.Index('ix_artist_genres_genre_id', 'genre_id', 'artist_id'))
+
+venue_genres = db.Table(
+    'venue_genres',
+    db.Column('venue_id', db.Integer,
+              db.ForeignKey('Venue.id', ondelete='CASCADE'),
+              primary_key=True),
+    db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id'),
+              primary_key=True),
+    db.Index('ix_venue_genres_genre_id', 'genre_id', 'venue_id'))
+
+
+class Venue(db.Model):
+    __tablename__ = 'Venue'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    # city and state are kept alongside area_id for search and display
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    area_id = db.Column(db.Integer, db.ForeignKey('Area.id'), nullable=False)
+    address = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    image_link = db.Column(db.String(1024))
+    facebook_link = db.Column(db.String(1024))
+    website_link = db.Column(db.String(1024), default='')
+    seeking_talent = db.Column(db.Boolean(), default=False)
+    seeking_description = db.Column(db.String(), default='')
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0,
+                                     server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0,
+                                 server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=utcnow())
+    show = db.relationship('Show', backref='venue',
+                           lazy=True, cascade="all, delete-orphan")
+    genres = db.relationship('Genre', secondary=venue_genres,
+                             order_by='Genre.name', lazy=True)
+    search_vector = db.deferred(db.Column(
+        db.Text().with_variant(TSVECTOR(), 'postgresql')))
+
+    __table_args__ = (
+        db.Index('ix_Venue_state_city_name', 'state', 'city', 'name', 'id'),
+        db.Index('ix_Venue_area_id_name', 'area_id', 'name', 'id'),
+        db.Index('ix_Venue_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_Venue_search_vector', 'search_vector',
+                 postgresql_using='gin'),
+    )
+
+    def __repr__(self):
+        return f'{self.name} - {self.city}, {self.state}'
+
+
+class Show(db.Model):
+    __tablename__ = 'shows'
+
+    id = db.Column(db.Integer, primary_key=True)
+    start_time = db.Column(db.DateTime, nullable=False)
+    venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
+    artist_id = db.Column(
+        db.Integer, db.ForeignKey('Artist.id'), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=utcnow())
+
+    __table_args__ = (
+        db.Index('ix_shows_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_shows_artist_id_start_time', 'artist_id', 'start_time'),
+        db.Index('ix_shows_start_time_id', 'start_time', 'id'),
+    )
+
+    def __repr__(self) -> str:
+        return f'show start time {self.start_time}'
+
+
+class Artist(db.Model):
+    __tablename__ = 'Artist'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    genres = db.relationship('Genre', secondary=artist_genres,
+                             order_by='Genre.name', lazy=True)
+    image_link = db.Column(db.String(1024))
+    facebook_link = db.Column(db.String(1024))
+    show = db.relationship('Show', backref='artist',
+                           lazy=True, cascade="all, delete-orphan")
+    website_link = db.Column(db.String(1024), default='')
+    seeking_venue = db.Column(db.Boolean(), default=False)
+    seeking_description = db.Column(db.String(), default='')
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0,
+                                     server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0,
+                                 server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=utcnow())
+    search_vector = db.deferred(db.Column(
+        db.Text().with_variant(TSVECTOR(), 'postgresql')))
+
+    __table_args__ = (
+        db.Index('ix_Artist_name_id', 'name', 'id'),
+        db.Index('ix_Artist_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_Artist_search_vector', 'search_vector',
+                 postgresql_using='gin'),
+    )
+
+    def __repr__(self) -> str:
+        return f'{self.name} {self.city, self.state}'
+
+
+class ShowCounterWatermark(db.Model):
+    """Up to when shows have been moved from upcoming to past in the counters.
+
+    `upcoming_shows_count` and `past_shows_count` split shows at
+    `rolled_over_at`, not at the current time; `flask counters rollover`
+    moves the watermark forward. The table holds a single row.
+    """
+    __tablename__ = 'show_counter_watermark'
+
+    id = db.Column(db.Integer, primary_key=True)
+    rolled_over_at = db.Column(db.DateTime, nullable=False)
+
+
+search.install_sqlite_fallback(db.metadata)
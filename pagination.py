@@ -0,0 +1,130 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import literal, tuple_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values, direction='next'):
+    """Opaque, URL-safe token for the sort key of a boundary row."""
+    payload = [direction, [{'dt': v.isoformat()} if isinstance(v, datetime)
+                           else v for v in values]]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, values = json.loads(raw)
+        if direction not in ('next', 'prev') or not isinstance(values, list):
+            raise ValueError(cursor)
+        return direction, [datetime.fromisoformat(v['dt'])
+                           if isinstance(v, dict) else v for v in values]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+
+
+class Page(object):
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class StreamedPage(Page):
+    """A page whose rows are fetched from the cursor as they are iterated.
+
+    The rows can be iterated once. Its cursors are set while the rows go
+    by, so a template must read them after its loop over the page.
+    """
+
+    def __init__(self, rows, per_page, key, has_prev):
+        super().__init__(None)
+        self._rows = rows
+        self._per_page = per_page
+        self._key = key
+        self._has_prev = has_prev
+
+    def __iter__(self):
+        last = None
+        # the query's LIMIT is per_page + 1, so this reads the whole result
+        # and the cursor is closed by the time the loop ends
+        for count, row in enumerate(self._rows):
+            if count == self._per_page:
+                self.next_cursor = encode_cursor(self._key(last), 'next')
+                continue
+            if count == 0 and self._has_prev:
+                self.prev_cursor = encode_cursor(self._key(row), 'prev')
+            last = row
+            yield row
+
+
+def keyset_query(query, columns, cursor=None):
+    """`query` filtered to the rows after (or before) `cursor`, in order.
+
+    Returns the query, the direction and the decoded boundary values.
+    """
+    direction, after = decode_cursor(cursor) if cursor else ('next', None)
+    if after is not None:
+        if len(after) != len(columns):
+            raise InvalidCursor(cursor)
+        boundary = tuple_(*[literal(value, column.type)
+                            for column, value in zip(columns, after)])
+        query = query.filter(tuple_(*columns) > boundary if direction == 'next'
+                             else tuple_(*columns) < boundary)
+    if direction == 'next':
+        query = query.order_by(*columns)
+    else:
+        query = query.order_by(*[column.desc() for column in columns])
+    return query, direction, after
+
+
+def keyset_page(query, columns, key, cursor=None, per_page=50):
+    """One page of `query` ordered by `columns`, resumed from `cursor`.
+
+    `columns` must be unique taken together (end them with the primary key)
+    and `key(row)` must return their values for a row. Rows are located by
+    comparing the column tuple with the cursor, which an index on the same
+    columns answers directly, so every page costs the same however deep it
+    is.
+    """
+    query, direction, after = keyset_query(query, columns, cursor)
+    rows = query.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+        has_next, has_prev = True, more
+    else:
+        has_next, has_prev = more, after is not None
+
+    page = Page(rows)
+    if rows and has_next:
+        page.next_cursor = encode_cursor(key(rows[-1]), 'next')
+    if rows and has_prev:
+        page.prev_cursor = encode_cursor(key(rows[0]), 'prev')
+    return page
+
+
+def keyset_stream(query, columns, key, cursor=None, per_page=50,
+                  batch_size=50):
+    """Like `keyset_page`, but the rows are read while they are rendered.
+
+    The statement is executed here, so errors surface before a response
+    has started, and its rows are fetched `batch_size` at a time (from a
+    server-side cursor on PostgreSQL). A 'prev' page is read whole, since
+    it comes back in reverse.
+    """
+    ordered, direction, after = keyset_query(query, columns, cursor)
+    if direction == 'prev':
+        return keyset_page(query, columns, key, cursor, per_page)
+    rows = iter(ordered.limit(per_page + 1).yield_per(batch_size))
+    return StreamedPage(rows, per_page, key, after is not None)
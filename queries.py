@@ -0,0 +1,358 @@
+from datetime import datetime
+from itertools import groupby
+
+from flask import current_app, request
+from sqlalchemy import and_, case, func, or_, select, text, true, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db, detail_cache
+from models import Area, Artist, Genre, Show, Venue, artist_genres, venue_genres
+from pagination import keyset_page
+
+
+def listing_args():
+    """Read ?cursor= and ?limit= for a keyset-paginated listing."""
+    config = current_app.config
+    limit = request.args.get('limit', config['LISTING_PAGE_SIZE'], type=int)
+    return {'cursor': request.args.get('cursor'),
+            'per_page': min(max(limit, 1), config['MAX_LISTING_PAGE_SIZE'])}
+
+
+def lookup_ids(model, columns, keys):
+    """Map `keys`, tuples of `columns` values, to ids of `model` rows.
+
+    Missing rows are inserted with ON CONFLICT DO NOTHING and read back,
+    so two writers adding the same row at once both get its id.
+    """
+    keys = set(keys)
+    columns = [getattr(model, c) for c in columns]
+
+    def lookup():
+        return {tuple(row[1:]): row[0] for row in db.session.query(
+            model.id, *columns).filter(tuple_(*columns).in_(keys))}
+
+    ids = lookup() if keys else {}
+    missing = keys - ids.keys()
+    if missing:
+        dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(
+            db.session.connection().dialect.name)
+        if dialect:
+            insert = dialect.insert(model.__table__).on_conflict_do_nothing()
+        else:
+            insert = model.__table__.insert()
+        db.session.execute(insert, [dict(zip((c.key for c in columns), key))
+                                    for key in missing])
+        ids = lookup()
+    return ids
+
+
+def insert_with_ids(model, mappings):
+    """Bulk insert `mappings` into `model`'s table and set each one's `id`.
+
+    The rows still go in with one executemany. On PostgreSQL their ids are
+    drawn from the table's sequence first, in one statement. SQLite has no
+    sequence, but the insert holds the database's write lock and new rowids
+    follow the largest one, so the last len(mappings) ids are the rows',
+    in order. Elsewhere the ORM fetches each id, row by row.
+    """
+    if not mappings:
+        return
+    dialect = db.session.connection().dialect.name
+    if dialect == 'postgresql':
+        ids = db.session.execute(text(
+            'SELECT nextval(pg_get_serial_sequence(:table, \'id\')) '
+            'FROM generate_series(1, :count)'),
+            {'table': f'"{model.__tablename__}"', 'count': len(mappings)})
+        for mapping, (id,) in zip(mappings, ids):
+            mapping['id'] = id
+        db.session.bulk_insert_mappings(model, mappings)
+    elif dialect == 'sqlite':
+        db.session.bulk_insert_mappings(model, mappings)
+        ids = db.session.query(model.id).order_by(model.id.desc()).limit(
+            len(mappings)).all()
+        for mapping, (id,) in zip(mappings, reversed(ids)):
+            mapping['id'] = id
+    else:
+        db.session.bulk_insert_mappings(model, mappings, return_defaults=True)
+
+
+def area_ids(pairs):
+    """Map `(state, city)` pairs to `Area` ids, adding the missing areas."""
+    return lookup_ids(Area, ('state', 'city'), pairs)
+
+
+def area_id(state, city):
+    return area_ids([(state, city)])[(state, city)]
+
+
+def genre_ids(names):
+    """Map genre names to `Genre` ids, adding the missing genres."""
+    return {name: id for (name,), id in lookup_ids(
+        Genre, ('name',), ((name,) for name in names)).items()}
+
+
+def refresh_genre_counts(ids):
+    """Recount the artists of the given genres for the /artists facet."""
+    if ids:
+        db.session.query(Genre).filter(Genre.id.in_(ids)).update(
+            {Genre.artist_count: select(func.count()).where(
+                artist_genres.c.genre_id == Genre.id).scalar_subquery()},
+            synchronize_session=False)
+
+
+def set_genres(entity, names):
+    """Replace the genres of an artist or venue already in the session.
+
+    `updated_at` is bumped when they change, since the cached pages and
+    validators derive from it.
+    """
+    ids = genre_ids(names)
+    before = {genre.id for genre in entity.genres}
+    if before == set(ids.values()):
+        return
+    entity.genres = Genre.query.filter(Genre.id.in_(ids.values())).all()
+    entity.updated_at = datetime.utcnow()
+    if isinstance(entity, Artist):
+        db.session.flush()
+        refresh_genre_counts(before | set(ids.values()))
+
+
+def link_genres(model, mappings):
+    """Link bulk-inserted rows, which carry their `id`, to their `genres`."""
+    table, key = ((artist_genres, 'artist_id') if model is Artist
+                  else (venue_genres, 'venue_id'))
+    ids = genre_ids(g for m in mappings for g in m['genres'])
+    links = [{key: m['id'], 'genre_id': ids[g]}
+             for m in mappings for g in dict.fromkeys(m['genres'])]
+    if links:
+        db.session.execute(table.insert(), links)
+    if model is Artist:
+        refresh_genre_counts(set(ids.values()))
+
+
+def venue_directory(cursor=None, per_page=50, state=None, city=None):
+    """A page of venues grouped by area, each with its number of upcoming shows.
+
+    The page comes from a single statement that reads the venues' stored
+    `upcoming_shows_count`, so no shows are counted at request time.
+    Pages follow (state, city, name, id). With `state`, and optionally
+    `city`, only that area is read: the areas are found through their
+    unique (state, city) index and their venues through (area_id, name).
+    """
+    columns = [Venue.id, Venue.name, Venue.updated_at,
+               Venue.upcoming_shows_count.label('num_upcomming_shows')]
+    if state is None:
+        query = db.session.query(Venue.state, Venue.city, *columns)
+        order = [Venue.state, Venue.city, Venue.name, Venue.id]
+    else:
+        query = db.session.query(Area.state, Area.city, *columns).join(
+            Venue.area).filter(Area.state == state)
+        if city is not None:
+            query = query.filter(Area.city == city)
+        order = [Area.state, Area.city, Venue.name, Venue.id]
+    page = keyset_page(query, order,
+                       lambda r: (r.state, r.city, r.name, r.id),
+                       cursor, per_page)
+
+    areas = []
+    for (state, city), venues in groupby(page, key=lambda r: (r.state, r.city)):
+        venues = list(venues)
+        areas.append({'state': state, 'city': city,
+                      'updated_at': max(v.updated_at for v in venues),
+                      'venues': [{'id': v.id, 'name': v.name,
+                                  'num_upcomming_shows': v.num_upcomming_shows}
+                                 for v in venues]})
+    page.items = areas
+    return page
+
+
+def show_page_defaults():
+    default = current_app.config['DETAIL_SHOWS_PER_PAGE']
+    return {'past_page': 1, 'past_limit': default,
+            'upcoming_page': 1, 'upcoming_limit': default}
+
+
+def show_page_args():
+    """Read ?past_page=, ?past_limit=, ?upcoming_page= and ?upcoming_limit=."""
+    default = current_app.config['DETAIL_SHOWS_PER_PAGE']
+    maximum = current_app.config['MAX_SHOWS_PER_PAGE']
+    args = {}
+    for side in ('past', 'upcoming'):
+        page = request.args.get(f'{side}_page', 1, type=int)
+        limit = request.args.get(f'{side}_limit', default, type=int)
+        args[f'{side}_page'] = max(page, 1)
+        args[f'{side}_limit'] = min(max(limit, 1), maximum)
+    return args
+
+
+def split_shows(columns, join, condition, now=None, past_page=1,
+                past_limit=10, upcoming_page=1, upcoming_limit=10):
+    """One entity's past and upcoming shows, paginated, from a single query.
+
+    Both sides are ranked with window functions against the same captured
+    `now`: upcoming shows soonest first, past shows most recent first. Each
+    side always returns its first row as well so that its total count is
+    known even when the requested page is out of range.
+    """
+    now = now or datetime.now()
+    is_upcoming = Show.start_time > now
+    position = case(
+        (is_upcoming, func.row_number().over(
+            partition_by=is_upcoming, order_by=Show.start_time.asc())),
+        else_=func.row_number().over(
+            partition_by=is_upcoming, order_by=Show.start_time.desc()))
+    ranked = db.session.query(
+        *columns,
+        Show.start_time.label('start_time'),
+        is_upcoming.label('upcoming'),
+        position.label('position'),
+        func.count().over(partition_by=is_upcoming).label('total')).join(
+        *join).filter(condition).subquery()
+
+    past_offset = (past_page - 1) * past_limit
+    upcoming_offset = (upcoming_page - 1) * upcoming_limit
+    rows = db.session.query(ranked).filter(or_(
+        ranked.c.position == 1,
+        and_(ranked.c.upcoming == true(),
+             ranked.c.position.between(upcoming_offset + 1,
+                                       upcoming_offset + upcoming_limit)),
+        and_(ranked.c.upcoming != true(),
+             ranked.c.position.between(past_offset + 1,
+                                       past_offset + past_limit)))).order_by(
+        ranked.c.upcoming, ranked.c.position).all()
+
+    result = {'past_shows': [], 'past_shows_count': 0, 'past_page': past_page,
+              'past_limit': past_limit, 'upcoming_shows': [],
+              'upcoming_shows_count': 0, 'upcoming_page': upcoming_page,
+              'upcoming_limit': upcoming_limit}
+    for row in rows:
+        side, offset, limit = (('upcoming', upcoming_offset, upcoming_limit)
+                               if row.upcoming else
+                               ('past', past_offset, past_limit))
+        result[f'{side}_shows_count'] = row.total
+        if offset < row.position <= offset + limit:
+            show = {c.key: getattr(row, c.key) for c in columns}
+            show['start_time'] = row.start_time
+            result[f'{side}_shows'].append(show)
+    return result
+
+
+def venue_shows(venue_id, **page):
+    return split_shows([Show.id.label('show_id'),
+                        Artist.updated_at.label('artist_updated_at'),
+                        Artist.id.label('artist_id'),
+                        Artist.name.label('artist_name'),
+                        Artist.image_link.label('artist_image_link')],
+                       (Artist, Show.artist_id == Artist.id),
+                       Show.venue_id == venue_id, **page)
+
+
+def artist_shows(artist_id, **page):
+    return split_shows([Show.id.label('show_id'),
+                        Venue.updated_at.label('venue_updated_at'),
+                        Venue.id.label('venue_id'),
+                        Venue.name.label('venue_name'),
+                        Venue.image_link.label('venue_image_link')],
+                       (Venue, Show.venue_id == Venue.id),
+                       Show.artist_id == artist_id, **page)
+
+
+def venue_detail(venue_id, **page):
+    venue = db.session.query(Venue).get(venue_id)
+    if not venue:
+        return None
+    data = {'id': venue.id,
+            'name': venue.name,
+            'genres': [genre.name for genre in venue.genres],
+            'address': venue.address,
+            'city': venue.city,
+            'state': venue.state,
+            'phone': venue.phone,
+            'website': venue.website_link,
+            'facebook_link': venue.facebook_link,
+            'seeking_talent': venue.seeking_talent,
+            'seeking_description': venue.seeking_description,
+            'image_link': venue.image_link}
+    data.update(venue_shows(venue_id, **page))
+    return data
+
+
+def artist_detail(artist_id, **page):
+    artist = db.session.query(Artist).get(artist_id)
+    if not artist:
+        return None
+    data = {'id': artist.id,
+            'name': artist.name,
+            'genres': [genre.name for genre in artist.genres],
+            'city': artist.city,
+            'state': artist.state,
+            'phone': artist.phone,
+            'website': artist.website_link,
+            'facebook_link': artist.facebook_link,
+            'seeking_venue': artist.seeking_venue,
+            'seeking_description': artist.seeking_description,
+            'image_link': artist.image_link}
+    data.update(artist_shows(artist_id, **page))
+    return data
+
+
+def search_page_args():
+    """Read limit and offset for a page of search results."""
+    config = current_app.config
+    limit = request.values.get('limit', config['SEARCH_PAGE_SIZE'], type=int)
+    offset = request.values.get('offset', 0, type=int)
+    return {'limit': min(max(limit, 1), config['MAX_SEARCH_PAGE_SIZE']),
+            'offset': max(offset, 0)}
+
+
+#  Cache
+#  ----------------------------------------------------------------
+
+
+def cached_detail(kind, entity_id, loader, page, version):
+    """Detail dict for `kind:entity_id`, read through `detail_cache`.
+
+    The key carries `version`, the entity's `updated_at` token, so a write
+    in any worker moves every worker to a new key and the stale entries
+    age out. Only the default first page is cached; other pages, and
+    requests with no version to key on, go straight to the database.
+    """
+    if version is None or page != show_page_defaults():
+        return loader(entity_id, **page)
+    return detail_cache.get_or_set(f'{kind}:{entity_id}:{version}',
+                                   lambda: loader(entity_id, **page))
+
+
+def touch(model, ids):
+    """Bump `updated_at` on rows whose pages show something that changed.
+
+    The HTTP validators of those pages are derived from `updated_at`.
+    """
+    db.session.query(model).filter(model.id.in_(ids)).update(
+        {model.updated_at: datetime.utcnow()}, synchronize_session=False)
+
+
+def listing_version(stamped, counted):
+    """`(last_modified, token)` for a listing over `stamped` models.
+
+    One statement reads the newest `updated_at` of each stamped model and
+    the row count of each `counted` one; counts notice deletes, which
+    leave no newer timestamp behind.
+    """
+    columns = [select(func.max(m.updated_at)).scalar_subquery()
+               for m in stamped]
+    columns += [select(func.count(m.id)).scalar_subquery() for m in counted]
+    row = db.session.query(*columns).one()
+    stamps = [stamp for stamp in row[:len(stamped)] if stamp is not None]
+    return (max(stamps) if stamps else None), tuple(row)
+
+
+def entity_version(model):
+    """Version function for a detail page keyed by the model's id."""
+    def version(**view_args):
+        entity_id, = view_args.values()
+        updated_at = db.session.query(model.updated_at).filter(
+            model.id == entity_id).scalar()
+        if updated_at is not None:
+            return updated_at, updated_at.isoformat()
+    return version
@@ -0,0 +1,187 @@
+import re
+
+from sqlalchemy import DDL, DateTime, event, text
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+KINDS = ('venue', 'artist', 'show')
+
+TABLES = {'venue': 'Venue', 'artist': 'Artist'}
+
+
+def tokenize(term):
+    return TOKEN.findall((term or '').lower())
+
+
+class SearchEngine(object):
+    """Ranked prefix search over venues, artists and shows.
+
+    `search()` returns `(total, hits)` where hits are rows ordered by rank,
+    best first. Venue and artist hits carry `id`, `name`,
+    `upcoming_shows_count` and `rank`; show hits carry the show `id`, `start_time`, `artist_id`,
+    `artist_name`, `venue_id`, `venue_name` and `rank`. A show matches
+    when its artist or its venue does, so shows need no index of their own.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @classmethod
+    def prepare(cls, kind, term, limit=20, offset=0):
+        """`(statement, params)` for one search, or None for an empty term."""
+        if kind not in KINDS:
+            raise ValueError(f'unknown search kind: {kind}')
+        words = tokenize(term)
+        if not words:
+            return None
+        if kind == 'show':
+            statement = text(cls.show_sql).columns(start_time=DateTime)
+        else:
+            statement = text(cls.entity_sql.format(table=TABLES[kind]))
+        return statement, {'q': cls.match_query(words), 'kind': kind,
+                           'limit': limit, 'offset': offset}
+
+    @staticmethod
+    def results(rows):
+        return (rows[0].total if rows else 0), rows
+
+    def search(self, kind, term, limit=20, offset=0):
+        prepared = self.prepare(kind, term, limit, offset)
+        if prepared is None:
+            return 0, []
+        return self.results(self.session.execute(*prepared).all())
+
+    def search_all(self, term, limit=20):
+        return {kind: self.search(kind, term, limit) for kind in KINDS}
+
+
+class PostgresSearch(SearchEngine):
+    """tsvector columns kept current by triggers, queried through GIN."""
+
+    entity_sql = '''
+        SELECT e.id, e.name, e.upcoming_shows_count,
+               ts_rank(e.search_vector, q) AS rank,
+               count(*) OVER () AS total
+        FROM "{table}" e, to_tsquery('simple', :q) q
+        WHERE e.search_vector @@ q
+        ORDER BY rank DESC, e.name, e.id
+        LIMIT :limit OFFSET :offset'''
+
+    show_sql = '''
+        WITH q AS (SELECT to_tsquery('simple', :q) AS q),
+        hits AS (
+            SELECT s.id, ts_rank(a.search_vector, q.q) AS rank
+            FROM q, "Artist" a JOIN shows s ON s.artist_id = a.id
+            WHERE a.search_vector @@ q.q
+            UNION ALL
+            SELECT s.id, ts_rank(v.search_vector, q.q) AS rank
+            FROM q, "Venue" v JOIN shows s ON s.venue_id = v.id
+            WHERE v.search_vector @@ q.q)
+        SELECT s.id, s.start_time, a.id AS artist_id, a.name AS artist_name,
+               v.id AS venue_id, v.name AS venue_name, max(h.rank) AS rank,
+               count(*) OVER () AS total
+        FROM hits h
+        JOIN shows s ON s.id = h.id
+        JOIN "Artist" a ON a.id = s.artist_id
+        JOIN "Venue" v ON v.id = s.venue_id
+        GROUP BY s.id, a.id, v.id
+        ORDER BY rank DESC, s.start_time, s.id
+        LIMIT :limit OFFSET :offset'''
+
+    @staticmethod
+    def match_query(words):
+        return ' & '.join(f'{word}:*' for word in words)
+
+
+class SQLiteSearch(SearchEngine):
+    """FTS5 fallback so the app and its tests run without PostgreSQL."""
+
+    entity_sql = '''
+        WITH matches AS (
+            SELECT entity_id, -bm25(search_index, 0, 0, 10.0, 1.0) AS rank
+            FROM search_index
+            WHERE search_index MATCH :q AND search_index.kind = :kind)
+        SELECT e.id, e.name, e.upcoming_shows_count, m.rank,
+               count(*) OVER () AS total
+        FROM matches m JOIN "{table}" e ON e.id = m.entity_id
+        ORDER BY m.rank DESC, e.name, e.id
+        LIMIT :limit OFFSET :offset'''
+
+    show_sql = '''
+        WITH matches AS (
+            SELECT kind, entity_id,
+                   -bm25(search_index, 0, 0, 10.0, 1.0) AS rank
+            FROM search_index WHERE search_index MATCH :q),
+        hits AS (
+            SELECT s.id, m.rank FROM matches m
+            JOIN shows s ON m.kind = 'artist' AND s.artist_id = m.entity_id
+            UNION ALL
+            SELECT s.id, m.rank FROM matches m
+            JOIN shows s ON m.kind = 'venue' AND s.venue_id = m.entity_id)
+        SELECT s.id, s.start_time, a.id AS artist_id, a.name AS artist_name,
+               v.id AS venue_id, v.name AS venue_name, max(h.rank) AS rank,
+               count(*) OVER () AS total
+        FROM hits h
+        JOIN shows s ON s.id = h.id
+        JOIN "Artist" a ON a.id = s.artist_id
+        JOIN "Venue" v ON v.id = s.venue_id
+        GROUP BY s.id
+        ORDER BY rank DESC, s.start_time, s.id
+        LIMIT :limit OFFSET :offset'''
+
+    @staticmethod
+    def match_query(words):
+        return ' '.join(f'"{word}"*' for word in words)
+
+
+def engine_class(dialect_name):
+    return SQLiteSearch if dialect_name == 'sqlite' else PostgresSearch
+
+
+def engine_for(session):
+    return engine_class(session.connection().dialect.name)(session)
+
+
+def sqlite_index_ddl():
+    statements = [
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+               kind UNINDEXED, entity_id UNINDEXED, name, place)''',
+        'DELETE FROM search_index',
+    ]
+    for kind, table in TABLES.items():
+        place = "coalesce({0}.city, '') || ' ' || coalesce({0}.state, '')"
+        statements += [
+            f'''CREATE TRIGGER IF NOT EXISTS {kind}_search_insert
+                AFTER INSERT ON "{table}" BEGIN
+                    INSERT INTO search_index (kind, entity_id, name, place)
+                    VALUES ('{kind}', new.id, new.name, {place.format('new')});
+                END''',
+            f'''CREATE TRIGGER IF NOT EXISTS {kind}_search_update
+                AFTER UPDATE ON "{table}" BEGIN
+                    UPDATE search_index
+                    SET name = new.name, place = {place.format('new')}
+                    WHERE kind = '{kind}' AND entity_id = old.id;
+                END''',
+            f'''CREATE TRIGGER IF NOT EXISTS {kind}_search_delete
+                AFTER DELETE ON "{table}" BEGIN
+                    DELETE FROM search_index
+                    WHERE kind = '{kind}' AND entity_id = old.id;
+                END''',
+            f'''INSERT INTO search_index (kind, entity_id, name, place)
+                SELECT '{kind}', e.id, e.name, {place.format('e')}
+                FROM "{table}" e''',
+        ]
+    return statements
+
+
+def install_sqlite_fallback(metadata):
+    """Build the FTS5 index whenever `metadata.create_all()` runs on SQLite.
+
+    On PostgreSQL the schema comes from the search migration instead.
+    """
+    for statement in sqlite_index_ddl():
+        event.listen(metadata, 'after_create',
+                     DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(metadata, 'before_drop',
+                 DDL('DROP TABLE IF EXISTS search_index').execute_if(
+                     dialect='sqlite'))
@@ -0,0 +1,140 @@
+import itertools
+from datetime import datetime, timedelta
+
+# (city, state, relative weight): most venues and artists sit in a few
+# large scenes, with a long tail of smaller cities
+CITIES = [
+    ('New York', 'NY', 30), ('Los Angeles', 'CA', 24), ('Chicago', 'IL', 14),
+    ('San Francisco', 'CA', 12), ('Austin', 'TX', 11), ('Nashville', 'TN', 10),
+    ('Seattle', 'WA', 8), ('Atlanta', 'GA', 7), ('New Orleans', 'LA', 7),
+    ('Denver', 'CO', 6), ('Portland', 'OR', 6), ('Boston', 'MA', 5),
+    ('Philadelphia', 'PA', 5), ('Detroit', 'MI', 4), ('Minneapolis', 'MN', 4),
+    ('Miami', 'FL', 4), ('Kansas City', 'MO', 3), ('Salt Lake City', 'UT', 2),
+    ('Burlington', 'VT', 1), ('Missoula', 'MT', 1),
+]
+
+# (genre, relative weight)
+GENRES = [
+    ('Rock n Roll', 14), ('Pop', 12), ('Hip-Hop', 11), ('Jazz', 9),
+    ('Electronic', 9), ('Alternative', 8), ('R&B', 7), ('Country', 6),
+    ('Folk', 6), ('Blues', 5), ('Soul', 5), ('Punk', 4), ('Heavy Metal', 4),
+    ('Funk', 3), ('Reggae', 3), ('Classical', 2), ('Instrumental', 2),
+    ('Musical Theatre', 1), ('Other', 1),
+]
+
+# show start hours, weighted towards late evening
+HOURS = [(17, 1), (18, 3), (19, 6), (20, 9), (21, 8), (22, 5), (23, 2)]
+
+VENUE_WORDS = (['The Blue', 'The Velvet', 'Park Square', 'The Dueling',
+                'Golden', 'The Rusty', 'Midnight', 'Old Town', 'The Crystal',
+                'Harbor', 'The Red', 'Electric'],
+               ['Room', 'Hall', 'Lounge', 'Pianos Bar', 'Ballroom', 'Tavern',
+                'Theatre', 'Live', 'Warehouse', 'Club', 'Garden', 'Stage'])
+STREETS = ['Main St', 'Market St', 'Broadway', 'Mission St', '2nd Ave',
+           'Elm St', 'Valencia St', 'Frenchmen St', 'Sunset Blvd']
+ARTIST_WORDS = (['Guns N', 'Matt', 'The Wild', 'Quevedo', 'Silver', 'Lonely',
+                 'Neon', 'Paper', 'Static', 'Velvet', 'Broken', 'Sunday'],
+                ['Petals', 'Quevedo', 'Sax Band', 'Trio', 'Hearts', 'Wolves',
+                 'Machines', 'Radio', 'Satellites', 'Orchestra', 'Kids',
+                 'Collective'])
+
+
+def zipf_weights(n, s=1.1):
+    """Cumulative weights for picking among `n` items by Zipf's law.
+
+    A handful of venues host most shows and a handful of artists play
+    most of them; uniform picks would make every detail page look alike.
+    """
+    return list(itertools.accumulate(1 / (rank ** s)
+                                     for rank in range(1, n + 1)))
+
+
+def _city(rng):
+    city, state, _ = rng.choices(CITIES, [c[2] for c in CITIES])[0]
+    return city, state
+
+
+def _phone(rng):
+    return (f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-'
+            f'{rng.randint(0, 9999):04d}')
+
+
+def _name(rng, words, number):
+    first, second = words
+    return f'{rng.choice(first)} {rng.choice(second)} {number}'
+
+
+def venue_rows(count, rng, start=1):
+    """Column mappings for `count` venues, numbered from `start`."""
+    for number in range(start, start + count):
+        city, state = _city(rng)
+        seeking = rng.random() < 0.3
+        yield {'name': _name(rng, VENUE_WORDS, number),
+               'city': city,
+               'state': state,
+               'address': f'{rng.randint(1, 2000)} {rng.choice(STREETS)}',
+               'phone': _phone(rng),
+               'image_link': f'https://images.example.com/venues/{number}.jpg',
+               'facebook_link': f'https://www.facebook.com/venue{number}',
+               'website_link': f'https://venue{number}.example.com',
+               'seeking_talent': seeking,
+               'seeking_description':
+                   'Looking for local acts on weeknights.' if seeking else ''}
+
+
+def artist_rows(count, rng, start=1):
+    """Column mappings for `count` artists; `genres` is a list."""
+    for number in range(start, start + count):
+        city, state = _city(rng)
+        seeking = rng.random() < 0.4
+        genres = rng.choices([g for g, w in GENRES], [w for g, w in GENRES],
+                             k=rng.choice([1, 1, 2, 2, 3]))
+        yield {'name': _name(rng, ARTIST_WORDS, number),
+               'city': city,
+               'state': state,
+               'phone': _phone(rng),
+               'genres': list(dict.fromkeys(genres)),
+               'image_link': f'https://images.example.com/artists/{number}.jpg',
+               'facebook_link': 'https://facebook.com/users/10203040',
+               'website_link': f'https://artist{number}.example.com',
+               'seeking_venue': seeking,
+               'seeking_description':
+                   'Touring next season, open to bookings.' if seeking else ''}
+
+
+def show_rows(count, venue_ids, artist_ids, rng, now=None,
+              past_days=730, upcoming_days=180, upcoming_share=0.35):
+    """Shows spread over the last `past_days` and next `upcoming_days`.
+
+    Venues and artists are picked by Zipf's law in a shuffled order, so
+    the busiest ones are not simply the lowest ids.
+    """
+    now = now or datetime.now()
+    venue_ids, artist_ids = list(venue_ids), list(artist_ids)
+    rng.shuffle(venue_ids)
+    rng.shuffle(artist_ids)
+    venue_weights = zipf_weights(len(venue_ids))
+    artist_weights = zipf_weights(len(artist_ids))
+    hours, hour_weights = zip(*HOURS)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(count):
+        if rng.random() < upcoming_share:
+            day = rng.randint(1, upcoming_days)
+        else:
+            day = -rng.randint(1, past_days)
+        start_time = today + timedelta(
+            days=day, hours=rng.choices(hours, hour_weights)[0],
+            minutes=rng.choice([0, 0, 30]))
+        yield {'start_time': start_time,
+               'venue_id': rng.choices(venue_ids, cum_weights=venue_weights)[0],
+               'artist_id': rng.choices(artist_ids,
+                                        cum_weights=artist_weights)[0]}
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
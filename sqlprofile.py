@@ -0,0 +1,157 @@
+import re
+import time
+from collections import Counter
+from functools import partial
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|\?|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+def statement_shape(statement):
+    """`statement` with literals and parameters replaced by `?`.
+
+    Expanded IN lists collapse to `(?)`, so the same query issued for
+    different ids, or with a different number of ids, has one shape.
+    """
+    shape = _LITERALS.sub('?', statement)
+    shape = _LISTS.sub('(?)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def budget(statements=None, repeats=None):
+    """Override SQL_STATEMENT_BUDGET / SQL_REPEAT_BUDGET for one view.
+
+    `None` lifts the limit, for views whose statement count grows with
+    their input by design (bulk imports).
+    """
+    def decorator(view):
+        view.sql_budget = (statements, repeats)
+        return view
+    return decorator
+
+
+class RequestProfile(object):
+    """Statements issued while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed):
+        self.statements += 1
+        self.db_seconds += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """`(count, shape)` for every shape issued `threshold` times or more."""
+        return [(count, shape) for shape, count in self.shapes.most_common()
+                if count >= threshold]
+
+    def server_timing(self):
+        total = time.perf_counter() - self.started
+        return (f'db;dur={self.db_seconds * 1000:.1f};'
+                f'desc="{self.statements} queries", '
+                f'app;dur={total * 1000:.1f}')
+
+
+class SQLProfiler(object):
+    """Count the SQL statements each request issues and flag the costly ones.
+
+    A request that issues more than SQL_STATEMENT_BUDGET statements, or the
+    same statement shape SQL_REPEAT_BUDGET times or more (the usual sign of
+    an N+1 loop), is logged as a warning, or raises `BudgetExceeded` when
+    SQL_BUDGET_RAISE is set. Every profiled response carries a
+    `Server-Timing` header with the database time and statement count,
+    except a streamed one, whose budget is checked after its last chunk.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['SQL_PROFILE']:
+            return
+        self.app = app
+        # on the app's own engine, so other apps' statements never get here
+        engine = db.get_engine(app)
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def current(self):
+        if has_request_context():
+            return g.get('sql_profile')
+        return None
+
+    def _start(self):
+        g.sql_profile = RequestProfile()
+
+    def _before(self, conn, cursor, statement, parameters, context,
+                executemany):
+        if self.current() is not None:
+            conn.info.setdefault('sql_profile_started', []).append(
+                time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context,
+               executemany):
+        profile = self.current()
+        if profile is not None and conn.info.get('sql_profile_started'):
+            started = conn.info['sql_profile_started'].pop()
+            profile.record(statement, time.perf_counter() - started)
+
+    def _finish(self, response):
+        if response.is_streamed:
+            # a streamed body runs its queries after this hook: keep
+            # counting, and check the budget once the body has been sent
+            profile = g.get('sql_profile')
+            if profile is not None:
+                response.response = self._checked(
+                    response.response, partial(
+                        self._check, profile, request.endpoint,
+                        request.method, request.full_path))
+            return response
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+        response.headers['Server-Timing'] = profile.server_timing()
+        self._check(profile, request.endpoint, request.method,
+                    request.full_path)
+        return response
+
+    @staticmethod
+    def _checked(body, check):
+        yield from body
+        check()
+
+    def _check(self, profile, endpoint, method, path):
+        config = self.app.config
+        statements, repeats = getattr(
+            self.app.view_functions.get(endpoint), 'sql_budget',
+            (config['SQL_STATEMENT_BUDGET'], config['SQL_REPEAT_BUDGET']))
+        problems = []
+        if statements is not None and profile.statements > statements:
+            problems.append(f'{profile.statements} statements, '
+                            f'budget is {statements}')
+        if repeats is not None:
+            for count, shape in profile.repeated(repeats):
+                problems.append(f'{count}x {shape}')
+        if problems:
+            message = '%s %s is over the SQL budget:\n  %s' % (
+                method, path.rstrip('?'), '\n  '.join(problems))
+            if config['SQL_BUDGET_RAISE']:
+                raise BudgetExceeded(message)
+            self.app.logger.warning(message)
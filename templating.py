@@ -0,0 +1,119 @@
+"""Template compilation ahead of the first request.
+
+Jinja compiles a template to Python the first time it is loaded, in every
+worker. With TEMPLATE_CACHE_DIR set, the compiled bytecode goes to a
+FileSystemBytecodeCache there, so workers load it instead of compiling.
+They share the cache, and `flask templates compile` fills it at deploy
+time. An entry is used only while its template's source is unchanged.
+
+The directory is keyed by template path and Python version. Compile on
+the host, and at the path, the workers run from.
+
+With TEMPLATE_WARMUP on, wsgi.py also renders TEMPLATE_WARMUP_PATHS
+before the server sends any traffic to the worker.
+
+`render_streamed` sends a page while it is rendered, for the listings.
+"""
+import os
+import time
+
+import click
+from flask import (current_app, get_flashed_messages, render_template,
+                   stream_template)
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache
+
+templates_group = AppGroup('templates', help='Precompile the templates.')
+
+
+def init_app(app):
+    directory = app.config['TEMPLATE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+    app.cli.add_command(templates_group)
+
+
+def buffered(chunks, size):
+    """Join the small pieces Jinja yields into writes of about `size`."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def render_streamed(template_name, **context):
+    """A response that renders `template_name` as the client reads it.
+
+    The head of the page goes out before the rest is rendered, and the
+    page is never held whole in memory. Pass rows as an iterator, e.g. a
+    `pagination.StreamedPage`, and they are fetched as they are rendered
+    too. With STREAM_TEMPLATES off this is `render_template`.
+
+    Streamed responses carry no Server-Timing, because their queries run
+    after the headers are sent; the SQL budget is checked after the last
+    chunk.
+    """
+    config = current_app.config
+    if not config['STREAM_TEMPLATES']:
+        return render_template(template_name, **context)
+    # the layout pops the flashed messages from the session: do it now,
+    # while the session can still be saved with the response headers
+    get_flashed_messages()
+    return current_app.response_class(buffered(
+        stream_template(template_name, **context),
+        config['STREAM_BUFFER_SIZE']))
+
+
+def compile_templates(app):
+    """Load every HTML template once, filling the bytecode cache.
+
+    Returns the names loaded; a template that fails to compile raises.
+    """
+    env = app.jinja_env
+    names = env.list_templates(extensions=['html'])
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def warm_up(app, paths=None):
+    """Compile the templates and render `paths` through the test client.
+
+    Returns `(path, status, milliseconds)` for each request. Afterwards
+    the engine is disposed, so a preloading server doesn't pass the
+    connections this opened on to the workers it forks.
+    """
+    from extensions import db
+
+    compile_templates(app)
+    timings = []
+    client = app.test_client()
+    for path in paths or app.config['TEMPLATE_WARMUP_PATHS']:
+        started = time.perf_counter()
+        response = client.get(path)
+        response.close()
+        timings.append((path, response.status_code,
+                        (time.perf_counter() - started) * 1000))
+    db.get_engine(app).dispose()
+    app.logger.info('warm-up: %s', ', '.join(
+        f'{path} {status} {ms:.0f}ms' for path, status, ms in timings))
+    return timings
+
+
+@templates_group.command('compile')
+def compile_command():
+    """Compile every template into TEMPLATE_CACHE_DIR."""
+    app = current_app._get_current_object()
+    directory = app.config['TEMPLATE_CACHE_DIR']
+    if not directory:
+        raise click.UsageError('TEMPLATE_CACHE_DIR is not set')
+    started = time.perf_counter()
+    names = compile_templates(app)
+    click.echo(f'{len(names)} templates compiled into {directory} in '
+               f'{(time.perf_counter() - started) * 1000:.0f} ms')
@@ -0,0 +1,50 @@
+import re
+
+import pytest
+
+import config
+from app import create_app
+from extensions import db
+
+SERVER_TIMING_STATEMENTS = re.compile(r'desc="(\d+) queries"')
+
+
+@pytest.fixture
+def make_app():
+    """Build an app on a fresh in-memory database, with settings overridden.
+
+    TestingConfig profiles every request and raises `BudgetExceeded` when
+    one goes over the SQL budget.
+    """
+    contexts = []
+
+    def make(**overrides):
+        app = create_app(type('TestConfig', (config.TestingConfig,),
+                              overrides))
+        context = app.app_context()
+        context.push()
+        contexts.append(context)
+        db.create_all()
+        return app
+
+    yield make
+    for context in reversed(contexts):
+        db.session.remove()
+        db.drop_all()
+        context.pop()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def statement_count(response):
+    """Statements the request issued, from its Server-Timing header."""
+    return int(SERVER_TIMING_STATEMENTS.search(
+        response.headers['Server-Timing']).group(1))
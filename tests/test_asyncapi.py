@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Artist, Show, Venue
+from queries import area_id
+
+
+@pytest.fixture
+def client(make_app, tmp_path):
+    # the async driver opens connections of its own: they need a file
+    app = make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path}/fyyur.db',
+                   DETAIL_SHOWS_PER_PAGE=5)
+    assert 'async_api' in app.blueprints
+    return app.test_client()
+
+
+def add_venue(past, upcoming):
+    now = datetime.now()
+    venue = Venue(name='Fillmore', city='San Francisco', state='CA',
+                  area_id=area_id('CA', 'San Francisco'))
+    artist = Artist(name='Fillmore Band', city='San Francisco', state='CA')
+    db.session.add_all([venue, artist])
+    db.session.flush()
+    db.session.add_all(
+        Show(venue_id=venue.id, artist_id=artist.id,
+             start_time=now + timedelta(days=day))
+        for day in list(range(-past, 0)) + list(range(1, upcoming + 1)))
+    db.session.commit()
+    return venue.id
+
+
+def test_venue_shows_pages_each_side(client):
+    venue_id = add_venue(past=12, upcoming=3)
+
+    data = client.get(f'/api/v1/venues/{venue_id}/shows?past_page=3').json
+    assert (data['past_shows_count'], data['upcoming_shows_count']) == (12, 3)
+    assert (data['past_page'], data['past_limit']) == (3, 5)
+    assert len(data['past_shows']) == 2
+    assert len(data['upcoming_shows']) == 3
+    starts = [show['start_time'] for show in data['upcoming_shows']]
+    assert starts == sorted(starts)
+
+
+def test_out_of_range_page_keeps_the_total(client):
+    venue_id = add_venue(past=12, upcoming=3)
+
+    data = client.get(f'/api/v1/venues/{venue_id}/shows?past_page=50').json
+    assert data['past_shows'] == []
+    assert data['past_shows_count'] == 12
+    assert data['upcoming_shows_count'] == 3
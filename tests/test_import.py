@@ -0,0 +1,78 @@
+import io
+
+from sqlalchemy import event
+
+from extensions import db
+from models import Artist, Genre, artist_genres
+from views.admin import import_rows
+
+FACEBOOK = 'https://facebook.com/users/10203040'
+GENRES = ['Jazz', 'Blues', 'Folk', 'Classical']
+
+
+def artists_csv(count, prefix):
+    lines = ['name,city,state,phone,genres,image_link,facebook_link']
+    lines += [f'{prefix} {i},San Francisco,CA,123-123-1234,'
+              f'{GENRES[i % 4]};{GENRES[(i + 1) % 4]},http://img.example,'
+              f'{FACEBOOK}' for i in range(count)]
+    return io.StringIO('\n'.join(lines) + '\n')
+
+
+def import_counting_statements(kind, stream):
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_engine()
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        report = import_rows(kind, stream, 'csv')
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return report, len(statements)
+
+
+def test_artist_import_links_genres_in_bulk(app):
+    # adds the genres, which later imports only look up
+    import_rows('artists', artists_csv(4, 'First'), 'csv')
+    small, small_statements = import_counting_statements(
+        'artists', artists_csv(5, 'Small'))
+    large, large_statements = import_counting_statements(
+        'artists', artists_csv(200, 'Large'))
+
+    assert (small.inserted, large.inserted) == (5, 200)
+    assert large_statements == small_statements
+    links = db.session.query(Artist.name, Genre.name).join(
+        artist_genres, artist_genres.c.artist_id == Artist.id).join(
+        Genre).filter(Artist.name.like('Large %'))
+    genres = {}
+    for artist, genre in links:
+        genres.setdefault(artist, set()).add(genre)
+    assert genres == {f'Large {i}': {GENRES[i % 4], GENRES[(i + 1) % 4]}
+                      for i in range(200)}
+
+
+def test_csv_splits_only_multi_valued_columns(app):
+    stream = io.StringIO(
+        'name,city,state,phone,genres,facebook_link,seeking_description\n'
+        f'Semis,San Francisco,CA,123-123-1234,Jazz;Folk,{FACEBOOK},'
+        'We play; you dance\n')
+    report = import_rows('artists', stream, 'csv')
+
+    assert (report.inserted, report.rejected) == (1, [])
+    artist = Artist.query.filter_by(name='Semis').one()
+    assert artist.seeking_description == 'We play; you dance'
+    assert sorted(genre.name for genre in artist.genres) == ['Folk', 'Jazz']
+
+
+def test_rejected_rows_report_their_lines(app):
+    stream = io.StringIO('venue_id,artist_id,start_time\n'
+                         'one,1,2030-01-01 20:00:00\n'
+                         '1,1\n')
+    report = import_rows('shows', stream, 'csv')
+
+    assert report.inserted == 0
+    assert [line for line, errors in report.rejected] == [2, 3]
+    assert 'venue_id' in report.rejected[0][1]
+    assert 'start_time' in report.rejected[1][1]
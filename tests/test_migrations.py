@@ -0,0 +1,27 @@
+import os
+
+import flask_migrate
+
+from extensions import db, init_migrate
+from models import Artist, Venue
+from queries import area_id
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), os.pardir, 'migrations')
+
+
+def test_migrated_sqlite_database_can_be_searched(make_app, tmp_path):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path}/fyyur.db')
+    db.drop_all()
+    init_migrate(app)
+    flask_migrate.upgrade(MIGRATIONS)
+
+    db.session.add_all([
+        Venue(name='Fillmore', city='San Francisco', state='CA',
+              area_id=area_id('CA', 'San Francisco')),
+        Artist(name='Fillmore Band', city='San Francisco', state='CA')])
+    db.session.commit()
+    client = app.test_client()
+    for kind in ('venues', 'artists'):
+        response = client.post(f'/{kind}/search',
+                               data={'search_term': 'fill'})
+        assert '"fill": 1' in response.get_data(as_text=True), kind
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import template_rendered
+
+from conftest import statement_count
+from counters import count_shows
+from extensions import db
+from models import Artist, Show, Venue
+from queries import area_id
+
+
+@pytest.fixture
+def rendered(app):
+    """The context of each template the app renders."""
+    contexts = []
+
+    def record(sender, template, context, **extra):
+        contexts.append(context)
+
+    template_rendered.connect(record, app)
+    yield contexts
+    template_rendered.disconnect(record, app)
+
+
+def add_listings(count, first=0):
+    """Venue and artist number i, for i from `first`, get i upcoming shows.
+
+    Each pair also gets a past show, inserted first so that no show id
+    lines up with a venue or artist id.
+    """
+    now = datetime.now()
+    area = area_id('CA', 'San Francisco')
+    pairs = []
+    for i in range(first, first + count):
+        venue = Venue(name=f'Fillmore {i}', city='San Francisco', state='CA',
+                      area_id=area)
+        artist = Artist(name=f'Fillmore Band {i}', city='San Francisco',
+                        state='CA')
+        db.session.add_all([venue, artist])
+        pairs.append((i, venue, artist))
+    db.session.flush()
+    shows = [(venue.id, artist.id, now - timedelta(days=1))
+             for i, venue, artist in pairs]
+    shows += [(venue.id, artist.id, now + timedelta(days=day + 1))
+              for i, venue, artist in pairs for day in range(i)]
+    db.session.add_all(Show(venue_id=venue_id, artist_id=artist_id,
+                            start_time=start_time)
+                       for venue_id, artist_id, start_time in shows)
+    count_shows(shows)
+    db.session.commit()
+
+
+@pytest.mark.parametrize('kind', ['venues', 'artists'])
+def test_search_counts_upcoming_shows(client, rendered, kind):
+    add_listings(3)
+    small = client.post(f'/{kind}/search', data={'search_term': 'fillmore'})
+    add_listings(27, first=3)
+    large = client.post(f'/{kind}/search', data={'search_term': 'fillmore'})
+
+    assert small.status_code == large.status_code == 200
+    for context, total in zip(rendered, (3, 30)):
+        results = context['results']
+        assert results['count'] == total
+        assert results['data']
+        for hit in results['data']:
+            number = int(hit['name'].rsplit(' ', 1)[1])
+            assert hit['num_upcoming_show'] == number, hit
+    assert statement_count(large) == statement_count(small)
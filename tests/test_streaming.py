@@ -0,0 +1,85 @@
+import pytest
+
+from pagination import StreamedPage
+from sqlprofile import BudgetExceeded
+from views.admin import seed_database
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Every row a StreamedPage has pulled from its result so far."""
+    rows = []
+    init = StreamedPage.__init__
+
+    def counting_init(self, result, *args):
+        def counted():
+            for row in result:
+                rows.append(row)
+                yield row
+        init(self, counted(), *args)
+
+    monkeypatch.setattr(StreamedPage, '__init__', counting_init)
+    return rows
+
+
+@pytest.fixture
+def stream():
+    """GET a streamed response; return an iterator over its chunks.
+
+    Whatever a test leaves unread is read at teardown, so the request
+    ends and its result is closed before the database is dropped.
+    """
+    responses = []
+
+    def get(client, path):
+        response = client.get(path, buffered=False)
+        responses.append(response)
+        assert response.status_code == 200
+        assert response.is_streamed
+        return iter(response.response)
+
+    yield get
+    for response in responses:
+        for _ in response.response:
+            pass
+        response.close()
+
+
+def test_shows_head_goes_out_before_rows_are_fetched(make_app, fetched,
+                                                    stream):
+    # smaller than the page head, so the head is a chunk of its own
+    app = make_app(STREAM_BUFFER_SIZE=1024)
+    seed_database(venues=5, artists=20, shows=300)
+
+    chunks = stream(app.test_client(), '/shows?limit=200')
+    first = next(chunks)
+
+    assert b'<head>' in first and b'tile-show' not in first
+    assert fetched == []
+    body = b''.join(chunks)
+    assert body.count(b'tile-show') == len(fetched) - 1 == 200
+    assert b'class="next"' in body
+
+
+def test_shows_first_chunk_does_not_wait_for_the_page(client, fetched,
+                                                      stream):
+    seed_database(venues=5, artists=20, shows=300)
+
+    chunks = stream(client, '/shows?limit=200')
+    first = next(chunks)
+
+    assert b'<head>' in first
+    assert 0 < len(fetched) < 200
+    b''.join(chunks)
+    assert len(fetched) == 201
+
+
+@pytest.mark.parametrize('path', ['/shows', '/artists'])
+def test_streamed_listings_are_held_to_the_sql_budget(make_app, path):
+    app = make_app(SQL_STATEMENT_BUDGET=1)
+    seed_database(venues=5, artists=20, shows=30)
+
+    response = app.test_client().get(path)
+    assert response.is_streamed
+    with pytest.raises(BudgetExceeded, match=f'GET {path} is over'):
+        response.get_data()
@@ -0,0 +1,46 @@
+import re
+from datetime import datetime, timedelta
+
+from conftest import statement_count
+from counters import count_shows
+from extensions import db
+from models import Artist, Show, Venue
+from queries import area_id
+from views.admin import seed_database
+
+
+def test_directory_statements_do_not_grow_with_venues(client):
+    seed_database(venues=5, artists=10, shows=100)
+    small = client.get('/venues')
+    seed_database(venues=45, artists=0, shows=100)
+    large = client.get('/venues')
+
+    assert small.status_code == large.status_code == 200
+    assert large.get_data(as_text=True).count('href="/venues/') >= 50
+    assert statement_count(large) == statement_count(small)
+
+
+def test_every_upcoming_show_is_reachable(client):
+    now = datetime.now()
+    venue = Venue(name='Fillmore', city='San Francisco', state='CA',
+                  area_id=area_id('CA', 'San Francisco'))
+    artist = Artist(name='Band', city='San Francisco', state='CA')
+    db.session.add_all([venue, artist])
+    db.session.flush()
+    shows = [(venue.id, artist.id, now + timedelta(days=day + 1))
+             for day in range(30)]
+    db.session.add_all(Show(venue_id=venue_id, artist_id=artist_id,
+                            start_time=start_time)
+                       for venue_id, artist_id, start_time in shows)
+    count_shows(shows)
+    db.session.commit()
+
+    for path in (f'/venues/{venue.id}', f'/artists/{artist.id}'):
+        seen = 0
+        while path:
+            html = client.get(path).get_data(as_text=True)
+            upcoming = html.split('Upcoming Shows')[1].split('<section>')[0]
+            seen += upcoming.count('tile-show')
+            later = re.search(r'class="next"><a href="([^"]+)">Later', html)
+            path = later and later.group(1).replace('&amp;', '&')
+        assert seen == 30
@@ -32,5 +32,7 @@ class ChoiceEnum(object):
         self.message = message
 
     def __call__(self, form, field):
-        if field.data not in self.choices:
-          raise ValidationError(f"Out of specified list: {field.data}, {self.choices} ")
\ No newline at end of file
+        allowed = [value for value, label in (field.choices or self.choices)]
+        invalid = [value for value in field.data if value not in allowed]
+        if invalid:
+          raise ValidationError(f"Out of specified list: {invalid}, {allowed} ")
\ No newline at end of file
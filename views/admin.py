@@ -0,0 +1,251 @@
+import io
+import random
+from functools import partial
+
+import click
+from flask import (Blueprint, current_app, flash, jsonify, redirect,
+                   render_template, url_for)
+from sqlalchemy import func
+
+import dbpool
+import importer
+import seed
+import sqlprofile
+from counters import count_show_batch, counter_mismatches, roll_over_counters
+from extensions import db
+from forms import ArtistForm, ImportForm, ShowImportForm, VenueForm
+from models import Artist, Show, Venue
+from queries import area_ids, insert_with_ids, link_genres
+
+# cli_group=None puts the commands at the top level: `flask import ...`
+bp = Blueprint('admin', __name__, cli_group=None)
+
+
+@bp.route('/admin/pool')
+def pool_stats():
+    return jsonify(dbpool.stats.snapshot())
+
+
+#  Import
+#  ----------------------------------------------------------------
+
+
+def venue_mapping(form):
+    return {'name': form.name.data,
+            'city': form.city.data,
+            'state': form.state.data,
+            'address': form.address.data,
+            'phone': form.phone.data,
+            'image_link': form.image_link.data,
+            'facebook_link': form.facebook_link.data,
+            'website_link': form.website_link.data,
+            'seeking_talent': form.seeking_talent.data,
+            'seeking_description': form.seeking_description.data,
+            'genres': form.genres.data}
+
+
+def artist_mapping(form):
+    return {'name': form.name.data,
+            'city': form.city.data,
+            'state': form.state.data,
+            'phone': form.phone.data,
+            'genres': form.genres.data,
+            'image_link': form.image_link.data,
+            'facebook_link': form.facebook_link.data,
+            'website_link': form.website_link.data,
+            'seeking_venue': form.seeking_venue.data,
+            'seeking_description': form.seeking_description.data}
+
+
+def show_mapping(form):
+    return {'start_time': form.start_time.data,
+            'venue_id': form.venue_id.data,
+            'artist_id': form.artist_id.data}
+
+
+def area_batch(batch):
+    """Point a batch of venues at their areas; no row is rejected."""
+    ids = area_ids((m['state'], m['city']) for line, m in batch)
+    for line, m in batch:
+        m['area_id'] = ids[(m['state'], m['city'])]
+    return {}
+
+
+def check_show_batch(batch):
+    """Reject shows whose venue or artist does not exist, two queries a batch."""
+    venue_ids = {m['venue_id'] for line, m in batch}
+    artist_ids = {m['artist_id'] for line, m in batch}
+    venues = {i for (i,) in db.session.query(Venue.id).filter(
+        Venue.id.in_(venue_ids))}
+    artists = {i for (i,) in db.session.query(Artist.id).filter(
+        Artist.id.in_(artist_ids))}
+    bad = {}
+    for line, m in batch:
+        errors = {}
+        if m['venue_id'] not in venues:
+            errors['venue_id'] = [f"no venue with id {m['venue_id']}"]
+        if m['artist_id'] not in artists:
+            errors['artist_id'] = [f"no artist with id {m['artist_id']}"]
+        if errors:
+            bad[line] = errors
+    return bad
+
+
+IMPORTS = {
+    'venues': dict(model=Venue, form_class=VenueForm, to_mapping=venue_mapping,
+                   check_batch=area_batch, insert=insert_with_ids,
+                   on_insert=partial(link_genres, Venue)),
+    'artists': dict(model=Artist, form_class=ArtistForm,
+                    to_mapping=artist_mapping, insert=insert_with_ids,
+                    on_insert=partial(link_genres, Artist)),
+    'shows': dict(model=Show, form_class=ShowImportForm,
+                  to_mapping=show_mapping, check_batch=check_show_batch,
+                  on_insert=count_show_batch),
+}
+
+
+def import_rows(kind, stream, format):
+    list_fields = importer.list_fields(IMPORTS[kind]['form_class'])
+    try:
+        return importer.run_import(
+            db.session, rows=importer.read_rows(stream, format, list_fields),
+            batch_size=current_app.config['IMPORT_BATCH_SIZE'], **IMPORTS[kind])
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+@bp.cli.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORTS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', type=click.Choice(importer.FORMATS),
+              help='csv or ndjson; guessed from the file name by default.')
+def import_command(kind, path, format):
+    """Bulk import venues, artists or shows from a CSV or NDJSON file."""
+    with open(path, newline='', encoding='utf-8') as stream:
+        report = import_rows(kind, stream,
+                             format or importer.guess_format(path))
+    for line, errors in report.rejected:
+        click.echo(f'line {line}: {errors}', err=True)
+    click.echo(f'{kind}: {report}')
+
+
+def new_import_form():
+    form = ImportForm()
+    form.kind.choices = sorted(IMPORTS)
+    return form
+
+
+@bp.route('/admin/import', methods=['GET'])
+def import_form():
+    return render_template('forms/import.html', form=new_import_form())
+
+
+@bp.route('/admin/import', methods=['POST'])
+@sqlprofile.budget(statements=None, repeats=None)
+def import_submission():
+    form = new_import_form()
+    if not form.validate_on_submit():
+        for field, messages in form.errors.items():
+            flash(f'{field}: {", ".join(messages)}')
+        return redirect(url_for('admin.import_form'))
+    kind, upload = form.kind.data, form.file.data
+    try:
+        format = form.format.data or importer.guess_format(upload.filename)
+    except ValueError as e:
+        flash(str(e))
+        return redirect(url_for('admin.import_form'))
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8', newline='')
+    report = import_rows(kind, stream, format)
+    flash(f'{kind}: {report}')
+    return render_template('forms/import.html', form=form, report=report)
+
+
+#  Show counters
+#  ----------------------------------------------------------------
+
+
+@bp.cli.group('counters')
+def counters_group():
+    """Maintain the upcoming/past show counters on venues and artists."""
+
+
+@counters_group.command('rollover')
+def rollover_command():
+    """Move shows that have started since the last run to past.
+
+    Run it from cron every few minutes; the counters on the listings are
+    at most that much behind the clock.
+    """
+    moved = roll_over_counters()
+    click.echo(f'{moved} shows moved from upcoming to past')
+
+
+@counters_group.command('reconcile')
+@click.option('--fix', is_flag=True, help='Overwrite wrong counters.')
+def reconcile_command(fix):
+    """Check the counters against the shows table."""
+    wrong = 0
+    for model, column in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        for entity_id, stored, actual in counter_mismatches(model, column):
+            wrong += 1
+            click.echo(f'{model.__tablename__} {entity_id}: '
+                       f'stored {stored}, actual {actual}', err=True)
+            if fix:
+                db.session.query(model).filter(model.id == entity_id).update(
+                    {model.upcoming_shows_count: actual[0],
+                     model.past_shows_count: actual[1]},
+                    synchronize_session=False)
+    if fix:
+        db.session.commit()
+    else:
+        db.session.rollback()
+    click.echo(f'{wrong} wrong counters' + (', fixed' if fix and wrong else ''))
+    if wrong and not fix:
+        raise SystemExit(1)
+
+
+#  Seed
+#  ----------------------------------------------------------------
+
+
+def seed_database(venues, artists, shows, random_seed=0, batch_size=1000):
+    """Bulk insert synthetic venues, artists and shows (see seed.py).
+
+    Shows are spread over every venue and artist in the database, the
+    existing ones included. The same `random_seed` gives the same data.
+    """
+    rng = random.Random(random_seed)
+    first_venue = (db.session.query(func.max(Venue.id)).scalar() or 0) + 1
+    first_artist = (db.session.query(func.max(Artist.id)).scalar() or 0) + 1
+    for batch in seed.batched(seed.venue_rows(venues, rng, first_venue),
+                              batch_size):
+        ids = area_ids((row['state'], row['city']) for row in batch)
+        db.session.bulk_insert_mappings(Venue, [
+            dict(row, area_id=ids[(row['state'], row['city'])])
+            for row in batch])
+    for batch in seed.batched(seed.artist_rows(artists, rng, first_artist),
+                              batch_size):
+        insert_with_ids(Artist, batch)
+        link_genres(Artist, batch)
+    db.session.commit()
+    venue_ids = [i for (i,) in db.session.query(Venue.id)]
+    artist_ids = [i for (i,) in db.session.query(Artist.id)]
+    if shows and venue_ids and artist_ids:
+        for batch in seed.batched(
+                seed.show_rows(shows, venue_ids, artist_ids, rng), batch_size):
+            db.session.bulk_insert_mappings(Show, batch)
+            count_show_batch(batch)
+        db.session.commit()
+
+
+@bp.cli.command('seed')
+@click.option('--venues', default=100, show_default=True)
+@click.option('--artists', default=300, show_default=True)
+@click.option('--shows', default=3000, show_default=True)
+@click.option('--random-seed', default=0, show_default=True)
+def seed_command(venues, artists, shows, random_seed):
+    """Fill the database with synthetic venues, artists and shows."""
+    seed_database(venues, artists, shows, random_seed,
+                  current_app.config['IMPORT_BATCH_SIZE'])
+    click.echo(f'{venues} venues, {artists} artists, {shows} shows')
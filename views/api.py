@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+
+from flask import (Blueprint, Response, abort, current_app, request,
+                   stream_with_context)
+
+from extensions import db
+from models import Artist, Show, Venue
+
+bp = Blueprint('api', __name__)
+
+
+def datetime_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400)
+
+
+def ndjson(rows):
+    """Serialize rows one at a time as newline-delimited JSON."""
+    for row in rows:
+        yield json.dumps(dict(row._mapping), default=datetime.isoformat) + '\n'
+
+
+def export(query, updated_column):
+    """Stream `query` from a server-side cursor, in constant memory."""
+    updated_after = datetime_arg('updated_after')
+    if updated_after:
+        query = query.filter(updated_column > updated_after)
+    rows = query.yield_per(current_app.config['EXPORT_BATCH_SIZE'])
+    return Response(stream_with_context(ndjson(rows)),
+                    mimetype='application/x-ndjson')
+
+
+@bp.route('/api/v1/shows.ndjson')
+def export_shows():
+    query = db.session.query(
+        Show.id, Show.start_time,
+        Show.venue_id, Venue.name.label('venue_name'),
+        Show.artist_id, Artist.name.label('artist_name'),
+        Show.updated_at).join(
+        Venue, Venue.id == Show.venue_id).join(
+        Artist, Artist.id == Show.artist_id).order_by(Show.id)
+    since = datetime_arg('since')
+    if since:
+        query = query.filter(Show.start_time >= since)
+    return export(query, Show.updated_at)
+
+
+@bp.route('/api/v1/venues.ndjson')
+def export_venues():
+    query = db.session.query(
+        Venue.id, Venue.name, Venue.city, Venue.state, Venue.address,
+        Venue.phone, Venue.image_link, Venue.facebook_link,
+        Venue.website_link, Venue.seeking_talent, Venue.seeking_description,
+        Venue.updated_at).order_by(Venue.id)
+    return export(query, Venue.updated_at)
@@ -0,0 +1,176 @@
+from flask import (Blueprint, abort, current_app, flash, redirect,
+                   render_template, request, url_for)
+from sqlalchemy import select
+
+import httpcache
+import search
+from extensions import db
+from forms import ArtistForm
+from models import Artist, Genre, Show, Venue, artist_genres
+from pagination import keyset_stream
+from queries import (artist_detail, cached_detail, entity_version,
+                     listing_args, listing_version, search_page_args,
+                     set_genres, show_page_args, touch)
+from templating import render_streamed
+
+bp = Blueprint('artists', __name__)
+
+
+@bp.route('/artists')
+@httpcache.conditional(lambda: listing_version([Artist], [Artist]))
+def artists():
+    """Artists by name; `?genre=Jazz&genre=Blues` keeps those playing any.
+
+    The filter goes through the (genre_id, artist_id) index of
+    artist_genres. The genre facet reads the stored `artist_count`s.
+    """
+    query = db.session.query(Artist.id, Artist.name)
+    selected = request.args.getlist('genre')
+    if selected:
+        query = query.filter(Artist.id.in_(
+            select(artist_genres.c.artist_id).join(Genre).where(
+                Genre.name.in_(selected))))
+    facet = db.session.query(Genre.name, Genre.artist_count).filter(
+        Genre.artist_count > 0).order_by(Genre.name).all()
+    page = keyset_stream(query, [Artist.name, Artist.id],
+                         lambda r: (r.name, r.id),
+                         batch_size=current_app.config['LISTING_FETCH_SIZE'],
+                         **listing_args())
+    return render_streamed('pages/artists.html', artists=page, page=page,
+                           genres=facet, selected=selected)
+
+
+@bp.route('/artists/search', methods=['POST'])
+def search_artists():
+    response = {}
+    keyword = request.form.get('search_term')
+    page = search_page_args()
+    if keyword:
+        response['count'], artists = search.engine_for(db.session).search(
+            'artist', keyword, **page)
+        response['data'] = [{'id': a.id, 'name': a.name,
+                             'num_upcoming_show': a.upcoming_shows_count}
+                            for a in artists]
+
+    return render_template('pages/search_artists.html', results=response, search_term=request.form.get('search_term', ''), page=page)
+
+
+@bp.route('/artists/<int:artist_id>')
+@httpcache.conditional(entity_version(Artist))
+def show_artist(artist_id):
+    data = cached_detail('artist', artist_id, artist_detail, show_page_args(),
+                         httpcache.current_version())
+    if not data:
+        abort(404)
+    return render_template('pages/show_artist.html', artist=data)
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    try:
+        form = ArtistForm()
+        artist = db.session.query(Artist).get(artist_id)
+        if artist:
+            form.name.data = artist.name
+            form.phone.data = artist.phone
+            form.genres.data = [genre.name for genre in artist.genres]
+            form.city.data = artist.city
+            form.state.data = artist.state
+            form.phone.data = artist.phone
+            form.website_link.data = artist.website_link
+            form.facebook_link.data = artist.facebook_link
+            form.seeking_venue.data = artist.seeking_venue
+            form.seeking_description.data = artist.seeking_description
+            form.image_link.data = artist.image_link
+
+        else:
+            raise Exception()
+    except:
+        db.session.rollback()
+    finally:
+        db.session.close()
+
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    try:
+        form = ArtistForm()
+        if form.validate_on_submit():
+            artist = Artist.query.get(artist_id)
+            artist.name = form.name.data
+            artist.city = form.city.data
+            artist.state = form.state.data
+            artist.phone = form.phone.data
+            set_genres(artist, form.genres.data)
+            artist.image_link = form.image_link.data
+            artist.facebook_link = form.facebook_link.data
+            artist.website_link = form.website_link.data
+            artist.seeking_venue = form.seeking_venue.data
+            artist.seeking_description = form.seeking_description.data
+            touch(Venue, select(Show.venue_id).where(
+                Show.artist_id == artist_id))
+            db.session.commit()
+            flash('updated successfully')
+        else:
+            flash('something went wrong!')
+    except:
+        flash('something went wrong!')
+        db.session.rollback()
+    finally:
+        db.session.close()
+
+    return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    form = ArtistForm(request.form)
+    if form.validate_on_submit() == False:
+        raise Exception(form.errors)
+    try:
+       # called upon submitting the new artist listing form
+
+        if form.errors.get('phone'):
+            flash('validation error, invalid phone format')
+
+        elif form.errors.get('facebook_link'):
+            flash(f'validation error, facebook address is out of specified list.')
+
+        elif form.errors:
+            flash(f'validation error {form.errors}')
+        data = ''
+        if form.validate_on_submit():
+            artist = Artist(name=form.name.data,
+                            city=form.city.data,
+                            state=form.state.data,
+                            phone=form.phone.data,
+                            image_link=form.image_link.data,
+                            facebook_link=form.facebook_link.data,
+                            website_link=form.website_link.data,
+                            seeking_venue=form.seeking_venue.data,
+                            seeking_description=form.seeking_description.data
+                            )
+            data = db.session.add(artist)
+            set_genres(artist, form.genres.data)
+            db.session.commit()
+
+            # on successful db insert, flash success
+            flash('Artist ' + request.form['name'] +
+                  ' was successfully listed!')
+        else:
+            flash('validation error')
+    except:
+        flash('An error occurred. Artist ' +
+              form.name.data + ' could not be listed.')
+        db.session.rollback()
+    finally:
+        db.session.close()
+    return render_template('pages/home.html')
@@ -0,0 +1,39 @@
+from flask import Blueprint, render_template, request
+
+import search
+from extensions import db
+from pagination import InvalidCursor
+from queries import search_page_args
+
+bp = Blueprint('main', __name__)
+
+
+@bp.route('/')
+def index():
+    return render_template('pages/home.html')
+
+
+@bp.route('/search')
+def search_all():
+    term = request.args.get('q', '')
+    results = {}
+    for kind, (count, hits) in search.engine_for(db.session).search_all(
+            term, search_page_args()['limit']).items():
+        results[kind] = {'count': count, 'data': hits}
+    return render_template('pages/search.html', results=results,
+                           search_term=term)
+
+
+@bp.app_errorhandler(InvalidCursor)
+def invalid_cursor(error):
+    return 'invalid cursor', 400
+
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500
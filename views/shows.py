@@ -0,0 +1,79 @@
+from flask import Blueprint, current_app, flash, render_template, request
+
+import httpcache
+import search
+from counters import count_shows
+from extensions import db
+from forms import ShowForm
+from models import Artist, Show, Venue
+from pagination import keyset_stream
+from queries import listing_args, listing_version, search_page_args
+from templating import render_streamed
+
+bp = Blueprint('shows', __name__)
+
+
+@bp.route('/shows')
+# shows are only ever deleted along with their venue
+@httpcache.conditional(lambda: listing_version([Show, Venue, Artist], [Venue]))
+def shows():
+    # displays list of shows at /shows
+    shows = db.session.query(
+        Venue.id.label('venue_id'),
+        Venue.name.label('venue_name'),
+        Artist.id.label('artist_id'),
+        Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link'),
+        Show.id,
+        Show.start_time).join(
+        Artist, Artist.id == Show.artist_id).join(Venue, Venue.id == Show.venue_id)
+    page = keyset_stream(shows, [Show.start_time, Show.id],
+                         lambda r: (r.start_time, r.id),
+                         batch_size=current_app.config['LISTING_FETCH_SIZE'],
+                         **listing_args())
+    return render_streamed('pages/shows.html', shows=page, page=page)
+
+
+@bp.route('/shows/search', methods=['POST'])
+def search_shows():
+    response = {}
+    keyword = request.form.get('search_term')
+    page = search_page_args()
+    if keyword:
+        response['count'], response['data'] = search.engine_for(
+            db.session).search('show', keyword, **page)
+    return render_template('pages/search_shows.html', results=response, search_term=request.form.get('search_term', ''), page=page)
+
+
+@bp.route('/shows/<int:show_id>', methods=['GET'])
+def show_detail(show_id):
+    result = db.session.query(Artist.id.label('id'), Artist.name.label('artist_name'), Artist.image_link.label('artist_image_link'), Artist.city.label(
+        'city'), Venue.name.label('venue_name'), Show.start_time.label('start_time')).join(Show, Show.id == Artist.id).join(Venue, Show.venue_id == Venue.id).all()
+    return render_template('pages/show.html', shows=result)
+
+
+@bp.route('/shows/create')
+def create_shows():
+    # renders form. do not touch
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    try:
+        form = ShowForm()
+        if form.validate_on_submit():
+            show = Show(start_time=form.start_time.data,
+                        venue_id=form.venue_id.data,
+                        artist_id=form.artist_id.data)
+            db.session.add(show)
+            count_shows([(show.venue_id, show.artist_id, show.start_time)])
+            db.session.commit()
+            flash('Show was successfully listed!')
+    except Exception:
+        flash(f'An error occurred. Show could not be listed.')
+        db.session.rollback()
+    finally:
+        db.session.close()
+    return render_template('pages/home.html')
@@ -0,0 +1,176 @@
+from flask import (Blueprint, abort, flash, redirect, render_template,
+                   request, url_for)
+from sqlalchemy import select
+
+import httpcache
+import search
+from counters import count_shows
+from extensions import db
+from forms import VenueForm
+from models import Artist, Show, Venue
+from queries import (area_id, cached_detail, entity_version, listing_args,
+                     listing_version, search_page_args, set_genres,
+                     show_page_args, touch, venue_detail, venue_directory)
+
+bp = Blueprint('venues', __name__)
+
+
+@bp.route('/venues')
+@httpcache.conditional(lambda: listing_version([Venue], [Venue]))
+def venues():
+    area = {}
+    if request.args.get('state'):
+        area['state'] = request.args['state']
+        area['city'] = request.args.get('city') or None
+    page = venue_directory(**listing_args(), **area)
+    return render_template('pages/venues.html', areas=page.items, page=page,
+                           area=area)
+
+
+@bp.route('/venues/search', methods=['POST'])
+def search_venues():
+    response = {}
+    keyword = request.form.get('search_term')
+    page = search_page_args()
+    if keyword:
+        response['count'], venues = search.engine_for(db.session).search(
+            'venue', keyword, **page)
+        response['data'] = [{'id': v.id, 'name': v.name,
+                             'num_upcoming_show': v.upcoming_shows_count}
+                            for v in venues]
+    return render_template('pages/search_venues.html', results=response, search_term=request.form.get('search_term', ''), page=page)
+
+
+@bp.route('/venues/<int:venue_id>')
+@httpcache.conditional(entity_version(Venue))
+def show_venue(venue_id):
+    data = cached_detail('venue', venue_id, venue_detail, show_page_args(),
+                         httpcache.current_version())
+    if not data:
+        abort(404)
+    return render_template('pages/show_venue.html', venue=data)
+
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    try:
+        form = VenueForm()
+        if form.errors.get('phone'):
+            flash('validation error, invalid phone format')
+        elif form.errors:
+            flash(f'validation error')
+
+        if form.validate_on_submit():
+            venue = Venue(name=form.name.data,
+                          city=form.city.data,
+                          state=form.state.data,
+                          area_id=area_id(form.state.data, form.city.data),
+                          address=form.address.data,
+                          phone=form.phone.data,
+                          image_link=form.image_link.data,
+                          facebook_link=form.facebook_link.data,
+                          website_link=form.website_link.data,
+                          seeking_talent=form.seeking_talent.data,
+                          seeking_description=form.seeking_description.data)
+            data = db.session.add(venue)
+            set_genres(venue, form.genres.data)
+            db.session.commit()
+            flash('Venue ' + form.name.data +
+                  ' was successfully listed!')
+        else:
+            flash('validation error')
+    except:
+        flash('An error occurred. Venue ' +
+              data.name + ' could not be listed.')
+
+        db.session.rollback()
+    finally:
+        db.session.close()
+    return render_template('pages/home.html')
+
+
+@bp.route('/venues/<int:venue_id>', methods=['DELETE', 'POST'])
+def delete_venue(venue_id):
+    try:
+
+        venue = Venue.query.get(venue_id)
+        if venue:
+            count_shows(db.session.query(
+                Show.venue_id, Show.artist_id, Show.start_time).filter(
+                Show.venue_id == venue_id).all(), sign=-1)
+            db.session.delete(venue)
+            db.session.commit()
+            flash('sucesfully deleted')
+        else:
+            raise Exception()
+    except:
+        flash('something went wrong. venue might be referenced in Show')
+        db.session.rollback()
+    finally:
+        db.session.close()
+
+    return redirect(url_for('main.index'))
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    try:
+        form = VenueForm()
+        venue = db.session.query(Venue).get(venue_id)
+        if venue:
+            form.name.data = venue.name
+            form.phone.data = venue.phone
+            form.address.data = venue.address
+            form.genres.data = [genre.name for genre in venue.genres]
+            form.city.data = venue.city
+            form.state.data = venue.state
+            form.website_link.data = venue.website_link
+            form.facebook_link.data = venue.facebook_link
+            form.seeking_talent.data = venue.seeking_talent
+            form.seeking_description.data = venue.seeking_description
+            form.image_link.data = venue.image_link
+        else:
+            raise Exception()
+    except:
+        db.session.rollback()
+    finally:
+        db.session.close()
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    try:
+        form = VenueForm()
+        if form.validate_on_submit():
+            venue = Venue.query.get(venue_id)
+            venue.name = form.name.data
+            venue.city = form.city.data
+            venue.state = form.state.data
+            venue.area_id = area_id(form.state.data, form.city.data)
+            set_genres(venue, form.genres.data)
+            venue.address = form.address.data
+            venue.phone = form.phone.data
+            venue.image_link = form.image_link.data
+            venue.facebook_link = form.facebook_link.data
+            venue.website_link = form.website_link.data
+            venue.seeking_talent = form.seeking_talent.data
+            venue.seeking_description = form.seeking_description.data
+            touch(Artist, select(Show.artist_id).where(
+                Show.venue_id == venue_id))
+            db.session.commit()
+            flash('updated successfully')
+        else:
+            flash('something went wrong!')
+    except:
+        flash('something went wrong!')
+        db.session.rollback()
+    finally:
+        db.session.close()
+    return redirect(url_for('venues.show_venue', venue_id=venue_id))
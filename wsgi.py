@@ -0,0 +1,14 @@
+"""WSGI entry point, for serving the app with a WSGI server:
+
+    flask --app wsgi templates compile   # once per deploy
+    gunicorn wsgi:app --workers 4
+
+With TEMPLATE_WARMUP on, each worker renders the key pages on import,
+before gunicorn hands it any requests.
+"""
+import templating
+from app import create_app
+
+app = create_app()
+if app.config['TEMPLATE_WARMUP']:
+    templating.warm_up(app)